@@ -1,87 +1,708 @@
 #!/usr/bin/env python3
 
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Set
 from typing import Tuple
 
+import argparse
+import bisect
+import itertools
+import mmap
+import multiprocessing
+import operator
+import os
+import struct
 import sys
+from array import array
+from collections import Counter
+from collections import defaultdict
 from collections import namedtuple
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 Cube = namedtuple('Cube', 'x y z')
 HyperCube = namedtuple('HyperCube', 'x y z w')
 
-def print_cubes(cubes: List[Cube]):
-    assert len(cubes[0]) == 3
+# Position of a cube in a pocket dimension with any number of dimensions
+Coordinate = Tuple[int, ...]
+
+AXIS_NAMES = 'xyzwvu'
+
+# Number of cycles after which the slabs of the parallel backend are rebalanced
+REBALANCE_CYCLES = 2
 
-    max_x, max_y, max_z = max_dimensions(cubes)
-    min_x, min_y, min_z = min_dimensions(cubes)
+def print_cubes(cubes: Iterable[Coordinate]):
+    active = set(cubes)
+    if not active:
+        return
 
-    # Print everything
-    for z in range(min_z, max_z + 1):
-        print('z={}'.format(z))
-        for y in range(min_y, max_y + 1):
-            for x in range(min_x, max_x + 1):
-                if (x, y, z) in cubes:
+    mins, maxs = bounding_box(active)
+    assert len(mins) >= 2
+
+    # Print one x-y plane for every combination of the other coordinates
+    planes = itertools.product(*(range(low, high + 1) for low, high in zip(mins[2:], maxs[2:])))
+    for plane in planes:
+        print(', '.join('{}={}'.format(name, c) for name, c in zip(AXIS_NAMES[2:], plane)))
+        for y in range(mins[1], maxs[1] + 1):
+            for x in range(mins[0], maxs[0] + 1):
+                if (x, y) + plane in active:
                     print('#', end = '')
                 else:
                     print('.', end = '')
             print()
         print('\n')
 
-def min_dimensions(cubes: List[Cube]) -> Tuple[int, int, int]:
-    min_x = min((cube.x for cube in cubes))
-    min_y = min((cube.y for cube in cubes))
-    min_z = min((cube.z for cube in cubes))
-
-    return min_x, min_y, min_z
-
-def max_dimensions(cubes: List[Cube]) -> Tuple[int, int, int]:
-    max_x = max((cube.x for cube in cubes))
-    max_y = max((cube.y for cube in cubes))
-    max_z = max((cube.z for cube in cubes))
-
-    return max_x, max_y, max_z
-
-def neighbor_cubes(cube: Cube) -> List[Cube]:
-    assert len(cube) == 3
-
-    others = []
-    for z in [ cube.z, cube.z - 1, cube.z + 1 ]:
-        for y in [ cube.y, cube.y - 1, cube.y + 1 ]:
-            for x in [ cube.x, cube.x - 1, cube.x + 1 ]:
-                others.append(Cube(x, y, z))
-
-    # Cube is not a neighbor of itself
-    others.remove(cube)
-
-    assert len(others) == 26
-
-    return others
-
-def neighbor_hypercubes(cube: HyperCube) -> List[HyperCube]:
-    assert len(cube) == 4
-
-    others = []
-    for w in [ cube.w, cube.w - 1, cube.w + 1 ]:
-        for z in [ cube.z, cube.z - 1, cube.z + 1 ]:
-            for y in [ cube.y, cube.y - 1, cube.y + 1 ]:
-                for x in [ cube.x, cube.x - 1, cube.x + 1 ]:
-                    others.append(HyperCube(x, y, z, w))
+def bounding_box(active: Set[Coordinate]) -> Tuple[Coordinate, Coordinate]:
+    dimensions = len(next(iter(active)))
+    mins = tuple(min(cube[axis] for cube in active) for axis in range(dimensions))
+    maxs = tuple(max(cube[axis] for cube in active) for axis in range(dimensions))
+
+    return mins, maxs
+
+def expand_dimensions(cubes: Iterable[Coordinate], dimensions: int) -> Set[Coordinate]:
+    # Place cubes into a pocket dimension with more dimensions by
+    # setting all additional coordinates to 0
+    result = set()
+    for cube in cubes:
+        assert len(cube) <= dimensions
+        result.add(tuple(cube) + (0,) * (dimensions - len(cube)))
+
+    return result
+
+def coordinate_base(active: Set[Coordinate]) -> int:
+    # Cubes are packed into a single integer (one digit per dimension) so
+    # that moving along an axis is a single addition. The base is chosen
+    # large enough that all coordinates and their neighbors fit into one digit.
+    radius = max((abs(c) for cube in active for c in cube), default = 0) + 2
+    return 1 << (2 * radius).bit_length()
+
+def encode_coordinate(cube: Coordinate, base: int) -> int:
+    key = 0
+    for c in reversed(cube):
+        key = key * base + c
+
+    return key
+
+def decode_coordinate(key: int, base: int, dimensions: int) -> Coordinate:
+    half = base // 2
+
+    cube = []
+    for _ in range(dimensions):
+        # Digits are signed, i.e. in range [-base/2, base/2)
+        digit = (key + half) % base - half
+        cube.append(digit)
+        key = (key - digit) // base
+
+    return tuple(cube)
+
+def cycle_sparse(active: Set[Coordinate]) -> Set[Coordinate]:
+    if not active:
+        return set()
+
+    dimensions = len(next(iter(active)))
+    base = coordinate_base(active)
+    strides = [ base ** i for i in range(dimensions) ]
+    encoded = { encode_coordinate(cube, base) for cube in active }
+
+    # Sum up active cubes in the 3x3x...x3 box around every cube.
+    # The box sum is separable so instead of visiting all 3^n - 1 neighbors
+    # of every active cube we sum over one axis at a time.
+    # Only cubes next to an active cube end up with a non-zero sum.
+    box_sum: Dict[int, int] = dict.fromkeys(encoded, 1)
+    for stride in strides:
+        summed: Dict[int, int] = defaultdict(int)
+        for key, count in box_sum.items():
+            summed[key - stride] += count
+            summed[key] += count
+            summed[key + stride] += count
+        box_sum = summed
+
+    # The box sum includes the cube itself:
+    # Inactive cubes with 3 neighbors (sum 3) become active
+    # Active cubes with 2 or 3 neighbors (sum 3 or 4) stay active
+    return {
+        decode_coordinate(key, base, dimensions) for key, count in box_sum.items()
+        if count == 3 or (count == 4 and key in encoded)
+    }
+
+def mirror_axes(active: Set[Coordinate], dimensions: int) -> Tuple[int, ...]:
+    # Axes on which all cubes have coordinate 0. Every later generation is
+    # mirror-symmetric on these axes because the rules are symmetric.
+    return tuple(
+        axis for axis in range(dimensions)
+        if all(cube[axis] == 0 for cube in active))
+
+def unfold_symmetric(active: Set[Coordinate], mirrored: Tuple[int, ...]) -> Set[Coordinate]:
+    # Reconstruct all cubes from the cubes with non-negative
+    # coordinates on the mirrored axes
+    result = set(active)
+    for axis in mirrored:
+        result.update([
+            cube[:axis] + (-cube[axis],) + cube[axis + 1:]
+            for cube in result if cube[axis] != 0
+        ])
+
+    return result
+
+def cycle_symmetric(active: Set[Coordinate], mirrored: Tuple[int, ...]) -> Set[Coordinate]:
+    # Like cycle_sparse but only cubes with non-negative coordinates on the
+    # mirrored axes are stored (one orthant). On these axes the cube at -1
+    # is the mirror image of the cube at +1.
+    if not active:
+        return set()
+
+    dimensions = len(next(iter(active)))
+    order = mirrored + tuple(axis for axis in range(dimensions) if axis not in mirrored)
+    base = coordinate_base(active)
+
+    # Mirrored axes are packed into the lowest digits. As they are never
+    # negative the digit of a mirrored axis can be read with plain division.
+    encoded = {
+        encode_coordinate(tuple(cube[axis] for axis in order), base)
+        for cube in active
+    }
+
+    box_sum: Dict[int, int] = dict.fromkeys(encoded, 1)
+    for position in range(dimensions):
+        stride = base ** position
+        summed: Dict[int, int] = defaultdict(int)
+
+        if position < len(mirrored):
+            for key, count in box_sum.items():
+                digit = (key // stride) % base
+                summed[key + stride] += count
+                summed[key] += count
+                if digit == 1:
+                    # Cube is counted at 0 for itself and for its mirror image
+                    summed[key - stride] += 2 * count
+                elif digit > 1:
+                    summed[key - stride] += count
+        else:
+            for key, count in box_sum.items():
+                summed[key - stride] += count
+                summed[key] += count
+                summed[key + stride] += count
+
+        box_sum = summed
+
+    result = set()
+    for key, count in box_sum.items():
+        if count == 3 or (count == 4 and key in encoded):
+            ordered = decode_coordinate(key, base, dimensions)
+            cube = [ 0 ] * dimensions
+            for position, axis in enumerate(order):
+                cube[axis] = ordered[position]
+            result.add(tuple(cube))
+
+    return result
+
+def in_slab(x: int, low: Optional[int], high: Optional[int]) -> bool:
+    # Slabs cover x in [low, high), None means the slab is open to that side
+    return (low is None or x >= low) and (high is None or x < high)
+
+def slab_edges(cubes: Set[Coordinate], low: Optional[int],
+               high: Optional[int]) -> Tuple[Set[Coordinate], Set[Coordinate]]:
+    # Cubes in the first and last layer of a slab. These are the only cubes
+    # the neighboring slabs need to know about.
+    lower = { cube for cube in cubes if cube[0] == low } if low is not None else set()
+    upper = { cube for cube in cubes if cube[0] == high - 1 } if high is not None else set()
+    return lower, upper
+
+def split_slabs(cubes: Set[Coordinate], bounds: List[Optional[int]]) -> List[Set[Coordinate]]:
+    # Cubes of every slab
+    result: List[Set[Coordinate]] = [ set() for _ in bounds[1:] ]
+    for cube in cubes:
+        result[bisect.bisect_right(bounds[1:-1], cube[0])].add(cube)
+    return result
+
+def slab_worker(connection, index: int, bounds: List[Optional[int]], cubes: Set[Coordinate]):
+    # Keep the cubes of one slab and cycle them on request. Only the halo
+    # (the edge layers of the neighboring slabs) is received and only the
+    # edge layers of this slab are sent back.
+    #
+    # When the slabs are rebalanced the worker reports how many cubes are in
+    # every layer, hands cubes outside its new bounds back and takes over the
+    # cubes other slabs handed back.
+    low, high = bounds[index], bounds[index + 1]
+    while True:
+        command, argument = connection.recv()
+        if command == 'cycle':
+            below, above = argument
+            cubes = {
+                cube for cube in cycle_sparse(cubes | below | above)
+                if in_slab(cube[0], low, high)
+            }
+            connection.send(slab_edges(cubes, low, high))
+        elif command == 'cubes':
+            connection.send(cubes)
+        elif command == 'layers':
+            connection.send(Counter(cube[0] for cube in cubes))
+        elif command == 'split':
+            bounds = argument
+            low, high = bounds[index], bounds[index + 1]
+            moved = split_slabs(cubes, bounds)
+            cubes = moved[index]
+            moved[index] = set()
+            connection.send(moved)
+        elif command == 'merge':
+            cubes |= argument
+            connection.send(slab_edges(cubes, low, high))
+        else:
+            connection.close()
+            return
+
+def slab_bounds(layers: Counter, number: int) -> List[Optional[int]]:
+    # Split space along the first axis into the given number of slabs with
+    # roughly the same number of active cubes, layers maps x to the number of
+    # cubes in that layer. Slab i covers x in [bounds[i], bounds[i + 1]), the
+    # outermost slabs are open to the outside.
+    #
+    # Inner slabs are at least one layer wide. An empty inner slab would not
+    # pass the halo on from one of its neighbors to the other.
+    total = sum(layers.values())
+    inner: List[int] = []
+    seen = 0
+    for x in sorted(layers):
+        # New slab starts at x once the slabs below hold their share
+        if len(inner) < number - 1 and seen * number >= total * (len(inner) + 1):
+            inner.append(x)
+        seen += layers[x]
+
+    start = min(layers) if layers else 0
+    while len(inner) < number - 1:
+        inner.append(inner[-1] + 1 if inner else start + 1)
+    for i in range(1, len(inner)):
+        inner[i] = max(inner[i], inner[i - 1] + 1)
+
+    return [ None ] + inner + [ None ]
+
+class ParallelPocket:
+    # Pocket dimension split into slabs along the first axis. Every slab is
+    # kept by its own worker process between cycles. In every cycle only the
+    # edge layers of the slabs are exchanged between neighboring slabs.
+    #
+    # Cubes growing beyond the outermost bounds belong to the outermost slabs.
+    # To keep the work balanced the slab bounds are recomputed every
+    # REBALANCE_CYCLES cycles and cubes are moved to their new slabs.
+
+    def __init__(self, active: Set[Coordinate], number: int):
+        self.bounds = slab_bounds(Counter(cube[0] for cube in active), number)
+        self.generation = 0
+
+        slab_cubes = split_slabs(active, self.bounds)
+        self.edges = [
+            slab_edges(cubes, low, high)
+            for low, high, cubes in zip(self.bounds, self.bounds[1:], slab_cubes)
+        ]
+
+        self.connections = []
+        self.processes = []
+        for index, cubes in enumerate(slab_cubes):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target = slab_worker, args = (worker_connection, index, self.bounds, cubes),
+                daemon = True)
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def cycle(self):
+        # Send every slab the upper edge of the slab below and
+        # the lower edge of the slab above
+        empty: Set[Coordinate] = set()
+        for index, connection in enumerate(self.connections):
+            below = self.edges[index - 1][1] if index > 0 else empty
+            above = self.edges[index + 1][0] if index + 1 < len(self.edges) else empty
+            connection.send(('cycle', (below, above)))
+
+        self.edges = [ connection.recv() for connection in self.connections ]
+
+        self.generation += 1
+        if len(self.connections) > 1 and self.generation % REBALANCE_CYCLES == 0:
+            self.rebalance()
+
+    def rebalance(self):
+        # Recompute slab bounds from the number of cubes in every layer
+        layers: Counter = Counter()
+        for connection in self.connections:
+            connection.send(('layers', None))
+        for connection in self.connections:
+            layers.update(connection.recv())
+
+        bounds = slab_bounds(layers, len(self.connections))
+        if bounds == self.bounds:
+            return
+        self.bounds = bounds
+
+        # Every slab hands back the cubes outside its new bounds, which are
+        # then given to the slabs they belong to now
+        for connection in self.connections:
+            connection.send(('split', bounds))
+        moved = [ connection.recv() for connection in self.connections ]
+        for index, connection in enumerate(self.connections):
+            connection.send(('merge', set().union(*(cubes[index] for cubes in moved))))
+
+        self.edges = [ connection.recv() for connection in self.connections ]
+
+    def cubes(self) -> Set[Coordinate]:
+        for connection in self.connections:
+            connection.send(('cubes', None))
+
+        result: Set[Coordinate] = set()
+        for connection in self.connections:
+            result |= connection.recv()
+
+        return result
+
+    def close(self):
+        for connection in self.connections:
+            connection.send(('close', None))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self) -> 'ParallelPocket':
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+@lru_cache(maxsize = None)
+def neighbor_offsets(dimensions: int) -> Tuple[Coordinate, ...]:
+    # All 3^n - 1 offsets from a cube to its neighbors
+    # (the zero offset is the cube itself and not a neighbor)
+    offsets = itertools.product((-1, 0, 1), repeat = dimensions)
+    return tuple(offset for offset in offsets if any(offset))
+
+class IncrementalPocket:
+    # Pocket dimension that keeps the number of active neighbors of every cube
+    # between cycles. Only cubes next to a cube that changed in the last cycle
+    # can change in this cycle, so regions that are stable cost nothing.
+
+    def __init__(self, active: Set[Coordinate]):
+        self.active = set(active)
+        self.dimensions = len(next(iter(active))) if active else 0
+        self.offsets = neighbor_offsets(self.dimensions)
+
+        # Cubes with at least one active neighbor, mapped to that count
+        self.neighbor_count: Dict[Coordinate, int] = defaultdict(int)
+        for cube in self.active:
+            self._update_neighbors(cube, 1)
+
+        # Cubes that have to be checked in next cycle
+        self.candidates = set(self.neighbor_count) | self.active
+
+    def _update_neighbors(self, cube: Coordinate, delta: int):
+        for offset in self.offsets:
+            neighbor = tuple(map(operator.add, cube, offset))
+            count = self.neighbor_count[neighbor] + delta
+            if count == 0:
+                del self.neighbor_count[neighbor]
+            else:
+                self.neighbor_count[neighbor] = count
+
+    def cycle(self):
+        activated = []
+        deactivated = []
+        for cube in self.candidates:
+            count = self.neighbor_count.get(cube, 0)
+            if cube in self.active:
+                if count not in (2, 3):
+                    deactivated.append(cube)
+            elif count == 3:
+                activated.append(cube)
+
+        # Apply changes only after all cubes have been checked
+        for cube in activated:
+            self.active.add(cube)
+            self._update_neighbors(cube, 1)
+        for cube in deactivated:
+            self.active.remove(cube)
+            self._update_neighbors(cube, -1)
+
+        # Changed cubes and their neighbors are the only ones
+        # whose neighbor count changed
+        self.candidates = set()
+        for cube in itertools.chain(activated, deactivated):
+            self.candidates.add(cube)
+            self.candidates.update(
+                tuple(map(operator.add, cube, offset)) for offset in self.offsets)
+
+def to_grid(active: Set[Coordinate], dimensions: int) -> Tuple['np.ndarray', Coordinate]:
+    # Store cubes in a dense boolean array covering their bounding box.
+    # Also return the coordinate of the cube at index (0, 0, ...).
+    if not active:
+        return np.zeros((0,) * dimensions, dtype = bool), (0,) * dimensions
+
+    origin, maxs = bounding_box(active)
+    shape = tuple(high - low + 1 for low, high in zip(origin, maxs))
+
+    grid = np.zeros(shape, dtype = bool)
+    indices = np.array(list(active), dtype = np.int64) - origin
+    grid[tuple(indices.T)] = True
+
+    return grid, origin
+
+def from_grid(grid: 'np.ndarray', origin: Coordinate) -> Set[Coordinate]:
+    indices = np.argwhere(grid) + origin
+    return set(map(tuple, indices.tolist()))
+
+def fit_grid(grid: 'np.ndarray', origin: Coordinate) -> Tuple['np.ndarray', Coordinate]:
+    # Crop grid to the bounding box of the active cubes and surround it with
+    # one layer of inactive cubes. Cubes can only become active next to an
+    # already active cube, so the grid grows by at most one layer per cycle.
+    slices = []
+    new_origin = []
+    for axis in range(grid.ndim):
+        other_axes = tuple(a for a in range(grid.ndim) if a != axis)
+        occupied = np.flatnonzero(grid.any(axis = other_axes))
+        if len(occupied) == 0:
+            return np.zeros((0,) * grid.ndim, dtype = bool), origin
+
+        slices.append(slice(occupied[0], occupied[-1] + 1))
+        new_origin.append(origin[axis] + int(occupied[0]) - 1)
+
+    return np.pad(grid[tuple(slices)], 1), tuple(new_origin)
+
+def cycle_dense(grid: 'np.ndarray', origin: Coordinate) -> Tuple['np.ndarray', Coordinate]:
+    grid, origin = fit_grid(grid, origin)
+    if grid.size == 0:
+        return grid, origin
+
+    # Sum up active cubes in the 3x3x...x3 box around every cube,
+    # one axis at a time by adding the array shifted by one in either direction.
+    # The outermost layer is inactive so nothing is lost at the edges.
+    box_sum = grid.astype(np.uint16)
+    for axis in range(grid.ndim):
+        lower = [ slice(None) ] * grid.ndim
+        upper = [ slice(None) ] * grid.ndim
+        lower[axis] = slice(None, -1)
+        upper[axis] = slice(1, None)
+
+        summed = box_sum.copy()
+        summed[tuple(upper)] += box_sum[tuple(lower)]
+        summed[tuple(lower)] += box_sum[tuple(upper)]
+        box_sum = summed
+
+    # The box sum includes the cube itself:
+    # Inactive cubes with 3 neighbors (sum 3) become active
+    # Active cubes with 2 or 3 neighbors (sum 3 or 4) stay active
+    return (box_sum == 3) | ((box_sum == 4) & grid), origin
+
+# Every backend takes the active cubes and yields its own representation of
+# the pocket dimension after every cycle, forever. The representation is only
+# converted to a set of active cubes when needed, so that cycling stays in
+# the native form of the backend (e.g. a numpy array for the dense backend).
+
+def states_sparse(active: Set[Coordinate], _dimensions: int) -> Iterator[Set[Coordinate]]:
+    while True:
+        active = cycle_sparse(active)
+        yield active
+
+def states_dense(active: Set[Coordinate],
+                 dimensions: int) -> Iterator[Tuple['np.ndarray', Coordinate]]:
+    if np is None:
+        raise RuntimeError('The dense backend requires numpy')
+
+    grid, origin = to_grid(active, dimensions)
+    while True:
+        grid, origin = cycle_dense(grid, origin)
+        yield grid, origin
+
+def states_symmetric(active: Set[Coordinate],
+                     dimensions: int) -> Iterator[Tuple[Set[Coordinate], Tuple[int, ...]]]:
+    mirrored = mirror_axes(active, dimensions)
+    while True:
+        active = cycle_symmetric(active, mirrored)
+        yield active, mirrored
+
+def states_incremental(active: Set[Coordinate], _dimensions: int) -> Iterator[IncrementalPocket]:
+    # The same pocket is yielded every time and updated in place by the next cycle
+    pocket = IncrementalPocket(active)
+    while True:
+        pocket.cycle()
+        yield pocket
+
+def states_parallel(active: Set[Coordinate], _dimensions: int) -> Iterator[ParallelPocket]:
+    # One slab per worker. The same pocket is yielded every time.
+    with ParallelPocket(active, os.cpu_count() or 1) as pocket:
+        while True:
+            pocket.cycle()
+            yield pocket
+
+def same_cubes(active: Set[Coordinate]) -> Set[Coordinate]:
+    return active
+
+# states: function yielding the state after every cycle
+# cubes:  function converting a state to a new set of active cubes
+#         (the set must not change in later cycles)
+Backend = namedtuple('Backend', 'states cubes')
+
+BACKENDS = {
+    'sparse': Backend(states_sparse, same_cubes),
+    'dense': Backend(states_dense, lambda state: from_grid(*state)),
+    'symmetric': Backend(states_symmetric, lambda state: unfold_symmetric(*state)),
+    'incremental': Backend(states_incremental, lambda pocket: set(pocket.active)),
+    'parallel': Backend(states_parallel, lambda pocket: pocket.cubes()),
+}
+
+def generations(cubes: Iterable[Coordinate], dimensions: int,
+                backend: str = 'sparse') -> Iterator[Set[Coordinate]]:
+    # Yield active cubes after every cycle. Every generation is a new set
+    # so generations can be kept and compared.
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend "{}"'.format(backend))
+
+    states, to_cubes = BACKENDS[backend]
+    for state in states(expand_dimensions(cubes, dimensions), dimensions):
+        yield to_cubes(state)
+
+def simulate(cubes: Iterable[Coordinate], dimensions: int, cycles: int,
+             backend: str = 'sparse',
+             progress: Optional[Callable[[int], None]] = None) -> Set[Coordinate]:
+    # Active cubes after the given number of cycles. Only the last
+    # generation is converted to a set of cubes. progress is called
+    # with the number of the generation after every cycle.
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend "{}"'.format(backend))
+
+    active = expand_dimensions(cubes, dimensions)
+    if cycles == 0:
+        return active
+
+    states, to_cubes = BACKENDS[backend]
+    iterator = states(active, dimensions)
+    try:
+        for generation in range(1, cycles + 1):
+            state = next(iterator)
+            if progress is not None:
+                progress(generation)
+
+        return to_cubes(state)
+    finally:
+        iterator.close()
+
+# Snapshot file layout (little-endian):
+#   header:  magic, version, format, dimensions, generation, cube count
+#   origin:  one int64 per dimension (lowest coordinate of bounding box)
+#   shape:   one uint64 per dimension (size of bounding box)
+#   payload: SNAPSHOT_BITMAP: one bit per cube in the bounding box
+#            SNAPSHOT_SPARSE: sorted uint64 index of every active cube
+# The index of a cube is its position in the bounding box with x
+# changing fastest.
+SNAPSHOT_MAGIC = b'PKTD'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_BITMAP = 0
+SNAPSHOT_SPARSE = 1
+SNAPSHOT_HEADER = struct.Struct('<4sBBBxQQ')
+
+def snapshot_strides(shape: Coordinate) -> List[int]:
+    strides = []
+    stride = 1
+    for size in shape:
+        strides.append(stride)
+        stride *= size
+
+    return strides
+
+def write_snapshot(filename, active: Set[Coordinate], generation: int = 0):
+    dimensions = len(next(iter(active))) if active else 0
+    if active:
+        origin, maxs = bounding_box(active)
+    else:
+        origin = maxs = (0,) * dimensions
+    shape = tuple(high - low + 1 for low, high in zip(origin, maxs))
+    strides = snapshot_strides(shape)
+
+    indices = [
+        sum((c - low) * stride for c, low, stride in zip(cube, origin, strides))
+        for cube in active
+    ]
+
+    # Use whatever is smaller: one bit per cube in the bounding box
+    # or eight bytes per active cube
+    volume = strides[-1] * shape[-1] if active else 0
+    if (volume + 7) // 8 <= 8 * len(indices):
+        kind = SNAPSHOT_BITMAP
+        payload = bytearray((volume + 7) // 8)
+        for index in indices:
+            payload[index >> 3] |= 1 << (index & 7)
+    else:
+        kind = SNAPSHOT_SPARSE
+        packed = array('Q', sorted(indices))
+        if sys.byteorder != 'little':
+            packed.byteswap()
+        payload = bytearray(packed.tobytes())
+
+    with open(filename, 'wb') as output_file:
+        output_file.write(SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, kind, dimensions, generation, len(indices)))
+        output_file.write(struct.pack('<{}q'.format(dimensions), *origin))
+        output_file.write(struct.pack('<{}Q'.format(dimensions), *shape))
+        output_file.write(payload)
+
+def read_snapshot(filename) -> Tuple[Set[Coordinate], int]:
+    # Returns active cubes and generation of snapshot
+    with open(filename, 'rb') as input_file:
+        with mmap.mmap(input_file.fileno(), 0, access = mmap.ACCESS_READ) as content:
+            magic, version, kind, dimensions, generation, count = \
+                SNAPSHOT_HEADER.unpack_from(content, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError('{} is not a snapshot file'.format(filename))
+
+            offset = SNAPSHOT_HEADER.size
+            origin = struct.unpack_from('<{}q'.format(dimensions), content, offset)
+            offset += 8 * dimensions
+            shape = struct.unpack_from('<{}Q'.format(dimensions), content, offset)
+            offset += 8 * dimensions
+
+            with memoryview(content) as view:
+                payload = view[offset:]
+                if kind == SNAPSHOT_BITMAP:
+                    indices = [
+                        8 * byte_index + bit
+                        for byte_index, byte in enumerate(payload) if byte
+                        for bit in range(8) if byte & (1 << bit)
+                    ]
+                elif sys.byteorder == 'little':
+                    indices = payload.cast('Q').tolist()
+                else:
+                    swapped = array('Q', payload.tobytes())
+                    swapped.byteswap()
+                    indices = swapped.tolist()
+                payload.release()
 
-    # Cube is not a neighbor of itself
-    others.remove(cube)
+    assert len(indices) == count
 
-    assert len(others) == 80
+    active = set()
+    for index in indices:
+        cube = []
+        for low, size in zip(origin, shape):
+            index, c = divmod(index, size)
+            cube.append(low + c)
+        active.add(tuple(cube))
 
-    return others
+    return active, generation
 
-def active_neighbors(cube: Cube, active_cubes: List[Cube]) -> int:
-    count = 0
-    for neighbor in neighbor_cubes(cube):
-        if neighbor in active_cubes:
-            count += 1
+def diff_snapshots(filename1, filename2) -> Tuple[Set[Coordinate], Set[Coordinate]]:
+    # Returns cubes activated and cubes deactivated from
+    # the first snapshot to the second one
+    active1, _ = read_snapshot(filename1)
+    active2, _ = read_snapshot(filename2)
 
-    return count
+    return active2 - active1, active1 - active2
 
 def read_input_file(filename) -> List[Cube]:
     cubes = []
@@ -100,71 +721,23 @@ def read_input_file(filename) -> List[Cube]:
 def cycle_cubes(cubes: List[Cube]) -> List[Cube]:
     assert len(cubes[0]) == 3
 
-    max_x, max_y, max_z = max_dimensions(cubes)
-    max_x += 1
-    max_y += 1
-    max_z += 1
-    min_x, min_y, min_z = min_dimensions(cubes)
-    min_x -= 1
-    min_y -= 1
-    min_z -= 1
-
-    # Add cubes after cycle to new list
-    new_cubes: List[Cube] = []
-
-    for z in range(min_z, max_z + 1):
-        for y in range(min_y, max_y + 1):
-            for x in range(min_x, max_x + 1):
-                current = Cube(x, y, z)
-                neighbors = active_neighbors(current, cubes)
-
-                # Check if cube is currently active
-                if current in cubes:
-                    # Cube is currently active
-                    if neighbors in [2, 3]:
-                        # Cube stays active
-                        new_cubes.append(current)
-                    else:
-                        # Cube becomes inactive
-                        pass
-                else:
-                    # Cube is currently inactive
-                    if neighbors == 3:
-                        # Cube becomes active
-                        new_cubes.append(current)
-                    else:
-                        # Cube stays inactive
-                        pass
-
-    return new_cubes
+    return [ Cube(*cube) for cube in cycle_sparse(set(cubes)) ]
 
 def cycle_hypercubes(cubes: List[HyperCube]) -> List[HyperCube]:
     assert len(cubes[0]) == 4
 
-    # Add cubes after cycle to new list
-    new_cubes: List[HyperCube] = []
+    return [ HyperCube(*cube) for cube in cycle_sparse(set(cubes)) ]
 
-    # Map all neighbors (those that might become active)
-    # of active nodes to their active neighbor count
-    cube_neighbor: Dict[HyperCube, int] = dict()
-    for current in cubes:
-        for neighbor in neighbor_hypercubes(current):
-            if neighbor not in cube_neighbor:
-                cube_neighbor[neighbor] = 1
-            else:
-                cube_neighbor[neighbor] += 1
-
-    # Cubes with 3 neighbors become active
-    # Cubes with 2 neighbors only stay active
-    for current, count in cube_neighbor.items():
-        if count == 3:
-            new_cubes.append(current)
-        elif count == 2 and current in cubes:
-            new_cubes.append(current)
-
-    return new_cubes
+def print_progress(_generation: int):
+    print('.', end = '')
+    sys.stdout.flush()
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices = BACKENDS.keys(), default = 'sparse',
+                        help = 'how to store the pocket dimension while cycling')
+    args = parser.parse_args()
+
     # Read input file
     cubes = read_input_file('day17_input.txt')
 
@@ -172,12 +745,8 @@ def main():
     ############ PART ONE ############
 
     # Cycle six times
-    new_cubes = cubes
     print('Booting up experimental pocket dimension ', end = '')
-    for _ in range(6):
-        new_cubes = cycle_cubes(new_cubes)
-        print('.', end = '')
-        sys.stdout.flush()
+    new_cubes = simulate(cubes, 3, 6, args.backend, print_progress)
     print('')
 
     print('Cubes in active state after bootup: {}'.format(len(new_cubes)))
@@ -185,17 +754,9 @@ def main():
 
     ############ PART TWO ############
 
-    # Convert cubes to hypercubes
-    print('Converting 3 dimensions to Hypercubes ...')
-    hypercubes = [ HyperCube(cube.x, cube.y, cube.z, 0) for cube in cubes ]
-
-    # Cycle six times
-    new_hypercubes = hypercubes
+    # Convert cubes to hypercubes and cycle six times
     print('Booting up experimental 4D pocket dimension ', end = '')
-    for _ in range(6):
-        new_hypercubes = cycle_hypercubes(new_hypercubes)
-        print('.', end = '')
-        sys.stdout.flush()
+    new_hypercubes = simulate(cubes, 4, 6, args.backend, print_progress)
     print('')
 
     print('Hypercubes in active state after bootup: {}'.format(len(new_hypercubes)))
@@ -1,27 +1,67 @@
 #!/usr/bin/env python3
 
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Pattern
+from typing import Set
+from typing import Tuple
+
+import itertools
+import mmap
+import os
 import re
-
-def read_input_file(filename):
+import time
+from collections import deque
+from collections import namedtuple
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+
+# Size of the regex a grammar was converted to and how long that took
+CompileStats = namedtuple('CompileStats', 'rules pattern_size convert_seconds compile_seconds')
+
+# Number of matching messages and (if requested) their indices
+MatchResult = namedtuple('MatchResult', 'count indices')
+
+def stream_input_file(filename, use_mmap: bool = True) -> Tuple[List[str], Iterator[str]]:
+    # Read rules and return them together with an iterator over the messages.
+    # Messages are only read from the file when the iterator advances. The
+    # iterator opens the file itself once it is started, so nothing is left
+    # open if it is never used.
     rules = []
-    inputs = []
+    with open(filename, 'rb') as input_file:
+        for line in iter(input_file.readline, b''):
+            if line.strip() == b'':
+                break
 
-    with open(filename, 'r') as input_file:
-        content = input_file.read().split('\n')
+            rules.append(line.decode().strip())
 
-        # Rules
-        for i, line in enumerate(content):
-            if line.strip() == '':
-                content = content[i+1:]
-                break
+        offset = input_file.tell()
 
-            rules.append(line.strip())
+    return rules, stream_messages(filename, offset, use_mmap)
 
-        # Input
-        for line in content:
-            inputs.append(line.strip())
+def stream_messages(filename, offset: int, use_mmap: bool = True) -> Iterator[str]:
+    # Messages in file starting at offset. The file is closed once the
+    # iterator is exhausted or closed.
+    with open(filename, 'rb') as input_file:
+        if use_mmap and os.fstat(input_file.fileno()).st_size > 0:
+            with mmap.mmap(input_file.fileno(), 0, access = mmap.ACCESS_READ) as content:
+                content.seek(offset)
+                for line in iter(content.readline, b''):
+                    yield line.decode().strip()
+        else:
+            input_file.seek(offset)
+            for line in input_file:
+                yield line.decode().strip()
 
-    return rules, inputs
+def read_input_file(filename) -> Tuple[List[str], List[str]]:
+    rules, messages = stream_input_file(filename)
+    return rules, list(messages)
 
 def rules_to_array(rules):
     arr = {}
@@ -34,81 +74,550 @@ def rules_to_array(rules):
 
     return arr
 
-def rule_to_regex(rules, rule, index):
-    # Check if rule is a loop
-    is_loop_rule = False
-    if index in [ int(x) for x in rule.split(' ') if x.isdigit() ]:
-        is_loop_rule = True
-
-    # Hardcode loop rule 8
-    if is_loop_rule and index == 8:
-        return '(' + rule_to_regex(rules, rules[42], 42) + ')+'
-
-    # Hardcode loop rule 11
-    if is_loop_rule and index == 11:
-        result42 = rule_to_regex(rules, rules[42], 42)
-        result31 = rule_to_regex(rules, rules[31], 31)
-
-        txt = '('
-        for i in range(10):
-            # (42){i}
-            txt += '({}){{{}}}'.format(result42, i + 1)
+def rule_references(rule: str) -> List[int]:
+    return [ int(x) for x in rule.split(' ') if x.isdigit() ]
+
+def topological_order(rules: Dict[int, str], start: int = 0) -> List[int]:
+    # Order rules reachable from start so that every rule comes after all
+    # rules it references. References of a rule to itself (loops) are ignored.
+    order: List[int] = []
+    visited: Set[int] = set()
+
+    stack = [ (start, False) ]
+    while stack:
+        index, expanded = stack.pop()
+        if expanded:
+            order.append(index)
+            continue
+        if index in visited:
+            continue
+        visited.add(index)
+
+        stack.append((index, True))
+        for reference in rule_references(rules[index]):
+            if reference != index and reference not in visited:
+                stack.append((reference, False))
+
+    return order
+
+def is_recursive(rules: Dict[int, str], start: int = 0) -> bool:
+    # Check if any rule reachable from start (directly or indirectly)
+    # references itself
+    visiting: Set[int] = set()
+    finished: Set[int] = set()
+
+    stack = [ (start, False) ]
+    while stack:
+        index, expanded = stack.pop()
+        if expanded:
+            visiting.remove(index)
+            finished.add(index)
+            continue
+        if index in finished:
+            continue
+
+        visiting.add(index)
+        stack.append((index, True))
+        for reference in rule_references(rules[index]):
+            if reference in visiting:
+                return True
+            if reference not in finished:
+                stack.append((reference, False))
+
+    return False
+
+def rule_to_regex(rules: Dict[int, str], regexes: Dict[int, str], index: int) -> str:
+    # Convert a single rule to regex. All rules it references
+    # must already be converted and stored in regexes.
+    rule = rules[index].strip()
+
+    # Recursive rules cannot be expressed as regex (use GrammarMatcher)
+    if index in rule_references(rule):
+        raise ValueError('Rule {} is recursive and cannot be converted to regex'.format(index))
 
-            # (42){i}
-            txt += '({}){{{}}}'.format(result31, i + 1)
-
-            txt += '|'
-        txt = txt[:-1]
-        txt += ')'
-        return txt
+    # Rule contains literal
+    if '"' in rule:
+        match = re.match('"(.*)"', rule)
+        assert match is not None
+
+        return re.escape(match.group(1))
+
+    # Rule contains XOR of concatenations of rules (or just one rule)
+    halves = []
+    for half in rule.split('|'):
+        halves.append(''.join(regexes[int(member)] for member in half.split()))
+
+    if len(halves) == 1:
+        return halves[0]
+    return '(' + '|'.join(halves) + ')'
+
+def rules_to_regexes(rules: Dict[int, str], start: int = 0) -> Dict[int, str]:
+    # Convert every rule exactly once
+    if is_recursive(rules, start):
+        raise ValueError('Rules are recursive and cannot be converted to regex')
+
+    regexes: Dict[int, str] = {}
+    for index in topological_order(rules, start):
+        regexes[index] = rule_to_regex(rules, regexes, index)
+
+    return regexes
+
+def compile_rules(rules: Dict[int, str], start: int = 0) -> Tuple[Pattern, CompileStats]:
+    begin = time.perf_counter()
+    regexes = rules_to_regexes(rules, start)
+    converted = time.perf_counter()
+    pattern = re.compile(regexes[start])
+    compiled = time.perf_counter()
+
+    stats = CompileStats(
+        rules = len(regexes),
+        pattern_size = len(regexes[start]),
+        convert_seconds = converted - begin,
+        compile_seconds = compiled - converted)
+
+    return pattern, stats
+
+# Earley item: rule, alternative of rule, number of members of the
+# alternative matched so far and position where matching the rule started
+EarleyItem = Tuple[int, int, int, int]
+
+class GrammarMatcher:
+    # Matches messages against rules directly, so rules may reference
+    # themselves or each other in any way (even left-recursive).
+    #
+    # This is an Earley recognizer: For every position of the message the
+    # set of partially matched alternatives (items) is kept. Items are
+    # processed with a worklist instead of recursion, so there is no limit
+    # on how deeply rules are nested in a match.
+
+    def __init__(self, rules: Dict[int, str], start: int = 0):
+        self.start = start
+
+        # Rule -> literal for literal rules
+        self.literals: Dict[int, str] = {}
+
+        # Rule -> alternatives (each a list of rules that are concatenated)
+        self.alternatives: Dict[int, List[List[int]]] = {}
+
+        for index, rule in rules.items():
+            rule = rule.strip()
+            if '"' in rule:
+                match = re.match('"(.*)"', rule)
+                assert match is not None
+                self.literals[index] = match.group(1)
+            else:
+                self.alternatives[index] = [ [ int(member) for member in half.split() ]
+                                             for half in rule.split('|') ]
+
+        # Rules that can match the empty string
+        self.nullable: Set[int] = {
+            index for index, literal in self.literals.items() if not literal }
+        changed = True
+        while changed:
+            changed = False
+            for index, alternatives in self.alternatives.items():
+                if index not in self.nullable and any(
+                        all(member in self.nullable for member in sequence)
+                        for sequence in alternatives):
+                    self.nullable.add(index)
+                    changed = True
+
+    def match_ends(self, message: str, index: int, position: int = 0) -> FrozenSet[int]:
+        # Positions where a match of rule index starting at position can end
+        if index in self.literals:
+            literal = self.literals[index]
+            if message.startswith(literal, position):
+                return frozenset((position + len(literal),))
+            return frozenset()
+
+        # Items at every position and items at every position waiting
+        # for a rule to be matched starting at that position
+        chart: List[Set[EarleyItem]] = [ set() for _ in range(len(message) + 1) ]
+        waiting: List[Dict[int, List[EarleyItem]]] = [ {} for _ in range(len(message) + 1) ]
+
+        for alternative in range(len(self.alternatives[index])):
+            chart[position].add((index, alternative, 0, position))
+
+        for current in range(position, len(message) + 1):
+            agenda = list(chart[current])
+            while agenda:
+                for new_item, at in self.advance(agenda.pop(), message, current, waiting):
+                    if new_item not in chart[at]:
+                        chart[at].add(new_item)
+                        if at == current:
+                            agenda.append(new_item)
+
+        # Rule index matched completely from position
+        complete = [
+            (index, alternative, len(sequence), position)
+            for alternative, sequence in enumerate(self.alternatives[index])
+        ]
+        return frozenset(
+            current for current in range(position, len(message) + 1)
+            if any(item in chart[current] for item in complete))
+
+    def advance(self, item: EarleyItem, message: str, current: int,
+                waiting: List[Dict[int, List[EarleyItem]]]) -> List[Tuple[EarleyItem, int]]:
+        # New items following from item at current and the positions they belong to
+        rule, alternative, dot, _ = item
+        sequence = self.alternatives[rule][alternative]
+        if dot == len(sequence):
+            return self.complete(item, current, waiting)
+        if sequence[dot] in self.literals:
+            return self.scan(item, message, current)
+        return self.predict(item, current, waiting)
+
+    def complete(self, item: EarleyItem, current: int,
+                 waiting: List[Dict[int, List[EarleyItem]]]) -> List[Tuple[EarleyItem, int]]:
+        # Rule of item is complete: advance items waiting for it
+        rule, _, _, origin = item
+        return [
+            ((parent_rule, parent_alternative, parent_dot + 1, parent_origin), current)
+            for parent_rule, parent_alternative, parent_dot, parent_origin
+            in waiting[origin].get(rule, ())
+        ]
+
+    def scan(self, item: EarleyItem, message: str, current: int) -> List[Tuple[EarleyItem, int]]:
+        # Next member of item is a literal: advance item if message continues with it
+        rule, alternative, dot, origin = item
+        literal = self.literals[self.alternatives[rule][alternative][dot]]
+        if message.startswith(literal, current):
+            return [ ((rule, alternative, dot + 1, origin), current + len(literal)) ]
+        return []
+
+    def predict(self, item: EarleyItem, current: int,
+                waiting: List[Dict[int, List[EarleyItem]]]) -> List[Tuple[EarleyItem, int]]:
+        # Next member of item is a rule: start matching it (once per position)
+        # and let item wait for it
+        rule, alternative, dot, origin = item
+        member = self.alternatives[rule][alternative][dot]
+
+        advanced = []
+        waiters = waiting[current].setdefault(member, [])
+        if not waiters:
+            for member_alternative in range(len(self.alternatives[member])):
+                advanced.append(((member, member_alternative, 0, current), current))
+        waiters.append(item)
+        if member in self.nullable:
+            advanced.append(((rule, alternative, dot + 1, origin), current))
+
+        return advanced
+
+    def matches(self, message: str) -> bool:
+        return len(message) in self.match_ends(message, self.start)
+
+class FiniteAutomaton:
+    # Deterministic finite automaton for finite languages (such as the
+    # language of a non-recursive rule). States are hash-consed: a state is
+    # only created if no state with the same acceptance and transitions exists.
+    # As all languages are finite the automaton has no cycles and is
+    # therefore always minimal.
+
+    # State that accepts nothing and state that only accepts the empty string
+    EMPTY = 0
+    ACCEPT = 1
+
+    def __init__(self, alphabet: str):
+        self.alphabet = alphabet
+        self.symbols = { char: i for i, char in enumerate(alphabet) }
+
+        self.accepting: List[bool] = []
+        self.transitions: List[Tuple[int, ...]] = []
+        self.unique: Dict[Tuple[bool, Tuple[int, ...]], int] = {}
+
+        self.union_cache: Dict[Tuple[int, int], int] = {}
+        self.concat_cache: Dict[Tuple[int, int], int] = {}
+
+        dead = (self.EMPTY,) * len(alphabet)
+        assert self.state(False, dead) == self.EMPTY
+        assert self.state(True, dead) == self.ACCEPT
+
+    def __len__(self) -> int:
+        return len(self.transitions)
+
+    def state(self, accepting: bool, transitions: Tuple[int, ...]) -> int:
+        key = (accepting, transitions)
+        if key not in self.unique:
+            self.unique[key] = len(self.transitions)
+            self.accepting.append(accepting)
+            self.transitions.append(transitions)
+
+        return self.unique[key]
+
+    def literal(self, text: str) -> int:
+        current = self.ACCEPT
+        for char in reversed(text):
+            transitions = [ self.EMPTY ] * len(self.alphabet)
+            transitions[self.symbols[char]] = current
+            current = self.state(False, tuple(transitions))
+
+        return current
+
+    def union(self, state1: int, state2: int) -> int:
+        if state1 == state2 or state2 == self.EMPTY:
+            return state1
+        if state1 == self.EMPTY:
+            return state2
+
+        key = (min(state1, state2), max(state1, state2))
+        if key not in self.union_cache:
+            self.union_cache[key] = self.state(
+                self.accepting[state1] or self.accepting[state2],
+                tuple(self.union(next1, next2) for next1, next2 in
+                      zip(self.transitions[state1], self.transitions[state2])))
+
+        return self.union_cache[key]
+
+    def concat(self, state1: int, state2: int) -> int:
+        # Every word of state1 followed by every word of state2
+        if state1 == self.EMPTY or state2 == self.EMPTY:
+            return self.EMPTY
+        if state1 == self.ACCEPT:
+            return state2
+
+        key = (state1, state2)
+        if key not in self.concat_cache:
+            result = self.state(False, tuple(
+                self.concat(next1, state2) for next1 in self.transitions[state1]))
+            if self.accepting[state1]:
+                result = self.union(result, state2)
+            self.concat_cache[key] = result
+
+        return self.concat_cache[key]
+
+    def matches(self, state: int, message: str) -> bool:
+        transitions = self.transitions
+        symbols = self.symbols
+        for char in message:
+            symbol = symbols.get(char)
+            if symbol is None:
+                return False
+            state = transitions[state][symbol]
+            if state == self.EMPTY:
+                return False
+
+        return self.accepting[state]
+
+    def words(self, state: int) -> Iterator[str]:
+        # All words accepted starting from state
+        if self.accepting[state]:
+            yield ''
+        for char, next_state in zip(self.alphabet, self.transitions[state]):
+            if next_state != self.EMPTY:
+                for word in self.words(next_state):
+                    yield char + word
+
+def rules_to_automaton(rules: Dict[int, str],
+                       start: int = 0) -> Tuple[FiniteAutomaton, Dict[int, int]]:
+    # Build one automaton containing a state for every rule reachable from start
+    if is_recursive(rules, start):
+        raise ValueError('Rules are recursive and cannot be converted to an automaton')
+
+    order = topological_order(rules, start)
+
+    literals: Dict[int, str] = {}
+    for index in order:
+        match = re.match('"(.*)"', rules[index].strip())
+        if match is not None:
+            literals[index] = match.group(1)
+
+    automaton = FiniteAutomaton(''.join(sorted(set(''.join(literals.values())))))
+
+    states: Dict[int, int] = {}
+    for index in order:
+        if index in literals:
+            states[index] = automaton.literal(literals[index])
+            continue
+
+        state = automaton.EMPTY
+        for half in rules[index].split('|'):
+            sequence = automaton.ACCEPT
+            for member in half.split():
+                sequence = automaton.concat(sequence, states[int(member)])
+            state = automaton.union(state, sequence)
+        states[index] = state
+
+    return automaton, states
+
+def build_chunk_matcher(rules: Dict[int, str], start: int = 0) -> Optional[Callable[[str], bool]]:
+    # Special matcher for grammars of the form
+    #   start: 8 11
+    #   8: 42 | 42 8
+    #   11: 42 31 | 42 11 31
+    # where 42 and 31 are non-recursive and all their words have the same length.
+    # Such a grammar matches n words of 42 followed by m words of 31 with
+    # n > m >= 1. Messages are cut into chunks of that length which are
+    # classified with a lookup table.
+    # Returns None if the grammar does not have this form.
+    def normalized(index: int) -> str:
+        return ' '.join(rules.get(index, '').split())
+
+    if (normalized(start) != '8 11' or normalized(8) != '42 | 42 8'
+            or normalized(11) != '42 31 | 42 11 31'):
+        return None
+
+    try:
+        automaton, states = rules_to_automaton({ **rules, start: '42 31' }, start)
+    except ValueError:
+        return None
+
+    words42 = set(automaton.words(states[42]))
+    words31 = set(automaton.words(states[31]))
+    widths = { len(word) for word in words42 | words31 }
+    if len(widths) != 1:
+        return None
+    width = widths.pop()
+    if width == 0:
+        return None
+
+    # Lookup table: chunk -> (is word of 42, is word of 31)
+    table = { word: (word in words42, word in words31) for word in words42 | words31 }
+    no_class = (False, False)
+
+    def matches(message: str) -> bool:
+        if len(message) % width != 0:
+            return False
+
+        classes = [ table.get(message[i:i + width], no_class)
+                    for i in range(0, len(message), width) ]
+        chunks = len(classes)
+
+        # Longest prefix of 42 and longest suffix of 31
+        prefix = 0
+        while prefix < chunks and classes[prefix][0]:
+            prefix += 1
+        suffix = 0
+        while suffix < chunks and classes[chunks - suffix - 1][1]:
+            suffix += 1
+
+        # Smallest number of 42 that is allowed (more 42 than 31)
+        count42 = max(chunks - suffix, chunks // 2 + 1)
+        return count42 <= prefix and count42 < chunks
+
+    return matches
+
+MATCH_METHODS = [ 'auto', 'regex', 'automaton', 'chunks', 'grammar' ]
+
+def build_matcher(rules: Dict[int, str], start: int = 0,
+                  method: str = 'auto') -> Callable[[str], bool]:
+    # auto: Use an automaton if possible, chunk classification for grammars
+    #       looping over rules 42 and 31, otherwise match rules directly
+    if method == 'auto':
+        if not is_recursive(rules, start):
+            method = 'automaton'
+        elif build_chunk_matcher(rules, start) is not None:
+            method = 'chunks'
+        else:
+            method = 'grammar'
+
+    if method == 'regex':
+        pattern, _ = compile_rules(rules, start)
+        return lambda message: pattern.fullmatch(message) is not None
+
+    if method == 'automaton':
+        automaton, states = rules_to_automaton(rules, start)
+        state = states[start]
+        return lambda message: automaton.matches(state, message)
+
+    if method == 'chunks':
+        matcher = build_chunk_matcher(rules, start)
+        if matcher is None:
+            raise ValueError('Rules cannot be matched by chunks')
+        return matcher
+
+    if method == 'grammar':
+        return GrammarMatcher(rules, start).matches
+
+    raise ValueError('Unknown match method "{}"'.format(method))
+
+# Matcher of worker process, built once per process by init_match_worker
+worker_matcher: Optional[Callable[[str], bool]] = None
+
+def init_match_worker(rules: Dict[int, str], start: int, method: str):
+    global worker_matcher
+    worker_matcher = build_matcher(rules, start, method)
+
+def match_chunk(chunk: Tuple[int, List[str]], with_indices: bool) -> Tuple[int, List[int]]:
+    # Returns number of matching messages and (if requested) their indices
+    first, messages = chunk
+    assert worker_matcher is not None
 
+    count = 0
+    indices = []
+    for i, message in enumerate(messages):
+        if worker_matcher(message):
+            count += 1
+            if with_indices:
+                indices.append(first + i)
+
+    return count, indices
+
+def chunked(messages: Iterable[str], chunk_size: int) -> Iterator[Tuple[int, List[str]]]:
+    # Split messages into lists of chunk_size messages
+    # together with the index of the first message
+    iterator = iter(messages)
+    first = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield first, chunk
+        first += len(chunk)
+
+def match_batch(rules: Dict[int, str], messages: Iterable[str], start: int = 0,
+                workers: Optional[int] = None, chunk_size: int = 10000,
+                with_indices: bool = False, method: str = 'auto') -> MatchResult:
+    # Count messages matching rules. The grammar is compiled once per process.
+    # Messages are consumed lazily and only a few chunks per worker are in
+    # flight at any time, so messages can be streamed from a file.
+    workers = workers or os.cpu_count() or 1
 
-    # Handle non-hardcoded, non-loop rules
+    count = 0
+    indices: List[int] = []
 
-    # Rule contains XOR
-    if '|' in rule:
-        half1 = rule.split('|')[0].strip()
-        half2 = rule.split('|')[1].strip()
+    # Build matcher here first, so unknown methods or rules not fit for the
+    # method raise ValueError before any worker process is started
+    init_match_worker(rules, start, method)
 
-        half1_result = rule_to_regex(rules, half1, index)
-        half2_result = rule_to_regex(rules, half2, index)
+    if workers == 1:
+        for chunk in chunked(messages, chunk_size):
+            chunk_count, chunk_indices = match_chunk(chunk, with_indices)
+            count += chunk_count
+            indices.extend(chunk_indices)
 
-        return '(' + half1_result +'|' + half2_result + ')'
+        return MatchResult(count, indices if with_indices else None)
 
-    # Rule contains literal
-    if '"' in rule:
-        match = re.match('"(.*)"', rule.strip())
+    with ProcessPoolExecutor(workers, initializer = init_match_worker,
+                             initargs = (rules, start, method)) as executor:
+        pending: Deque[Future] = deque()
+        for chunk in chunked(messages, chunk_size):
+            pending.append(executor.submit(match_chunk, chunk, with_indices))
 
-        return match.group(1)
+            # Results arrive in order of the chunks so indices stay sorted
+            while len(pending) >= 2 * workers or (pending and pending[0].done()):
+                chunk_count, chunk_indices = pending.popleft().result()
+                count += chunk_count
+                indices.extend(chunk_indices)
 
-    # Rule contains concatenation of rules (or just one rule)
-    result = ''
-    for member in rule.strip().split(' '):
-        result += rule_to_regex(rules, rules[int(member)].strip(), int(member))
+        for future in pending:
+            chunk_count, chunk_indices = future.result()
+            count += chunk_count
+            indices.extend(chunk_indices)
 
-    return result
+    return MatchResult(count, indices if with_indices else None)
 
 def main():
-    # Read input file
-    rules_str, inputs = read_input_file('day19_input.txt')
+    # Read rules from input file, messages are streamed from file when matching
+    rules_str, messages = stream_input_file('day19_input.txt')
     rules = rules_to_array(rules_str)
 
 
     ############ PART ONE ############
 
-    # Convert rules to regex
-    regex = '^' + rule_to_regex(rules, rules[0], 0) + '$'
+    # Count input lines matching rules
+    result = match_batch(rules, messages)
 
-    # Count input lines matching regex
-    count = 0
-    for line in inputs:
-        match = re.match('^' + regex + '$', line)
-        matched = (match is not None)
-
-        if matched:
-            count += 1
-
-    print('Part One: {}'.format(count))
+    print('Part One: {}'.format(result.count))
 
 
     ############ PART TWO ############
@@ -117,19 +626,12 @@ def main():
     rules[8] = '42 | 42 8'
     rules[11] = '42 31 | 42 11 31'
 
-    # Convert to regex again
-    regex = '^' + rule_to_regex(rules, rules[0], 0) + '$'
-
-    # Count input lines matching regex
-    count = 0
-    for line in inputs:
-        match = re.match(regex, line)
-        matched = (match is not None)
-
-        if matched:
-            count += 1
+    # Rules are recursive now and cannot be converted to regex,
+    # they are matched directly instead.
+    _, messages = stream_input_file('day19_input.txt')
+    result = match_batch(rules, messages)
 
-    print('Part Two: {}'.format(count))
+    print('Part Two: {}'.format(result.count))
 
 
 if __name__ == '__main__':
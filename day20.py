@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 
+from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 
-import math
+from collections import defaultdict
+from collections import namedtuple
 
 class Tile:
     def __init__(self, content: List[List[str]], index: int):
@@ -18,101 +22,125 @@ class Tile:
     def __eq__(self, other):
         return self.content == other.content
 
-    def rotate(self, number = 1) -> 'Tile':
-        rotated_tile = self
-
-        for _ in range(number):
-            # Create empty array
-            length = len(self.content)
-            new_content = [ [''] * length for x in range(length) ]
-
-            # Copy content as rotated
-            for y, line in enumerate(self.content):
-                for x, char in enumerate(line):
-                    new_content[x][length - y - 1] = char
-
-            rotated_tile = Tile(new_content, self.index)
-
-        return rotated_tile
-
-    def flip_h(self) -> 'Tile':
-        # Create empty array
-        length = len(self.content)
-        new_content = [ [''] * length for x in range(length) ]
-
-        # Flip content to new array
-        for y, line in enumerate(self.content):
-            for x, char in enumerate(line):
-                new_content[y][abs(length - x) - 1] = char
-
-        return Tile(new_content, self.index)
-
-    def flip_v(self) -> 'Tile':
-        # Create empty array
-        length = len(self.content)
-        new_content = [ [''] * length for x in range(length) ]
-
-        # Flip content to new array
-        for y, line in enumerate(self.content):
-            for x, char in enumerate(line):
-                new_content[abs(length - y) - 1][x] = char
-
-        return Tile(new_content, self.index)
-
-    def permutations(self) -> List['Tile']:
-        perms = []
-        perms.append(self)
-        perms.append(self.rotate(1))
-        perms.append(self.rotate(2))
-        perms.append(self.rotate(3))
-        perms.append(self.flip_h())
-        perms.append(self.flip_h().rotate(1))
-        perms.append(self.flip_v())
-        perms.append(self.flip_v().rotate(1))
-        perms.append(self.flip_h().flip_v())
-        perms.append(self.flip_h().flip_v().rotate(1))
-        return perms
-
-    @property
-    def top(self) -> str:
-        return ''.join(self.content[0])
-
-    @property
-    def bottom(self) -> str:
-        return ''.join(self.content[-1])
-
-    @property
-    def left(self) -> str:
-        return ''.join([ line[0] for line in self.content ])
-
-    @property
-    def right(self) -> str:
-        return ''.join([ line[-1] for line in self.content ])
-
-    def fits_permutated_above(self, other) -> Optional['Tile']:
-        for perm in other.permutations():
-            if self.fits_above(perm):
-                return perm
-        return None
+def border_signature(border: str) -> int:
+    # Border as binary number ('#' -> 1, '.' -> 0)
+    return int(border.replace('#', '1').replace('.', '0'), 2)
+
+def reverse_bits(value: int, size: int) -> int:
+    return int(format(value, '0{}b'.format(size))[::-1], 2)
+
+def canonical_edge(edge: int, size: int) -> int:
+    # An edge matches an edge with the same content in either direction
+    # (the other tile may be flipped), so use the smaller of both values.
+    return min(edge, reverse_bits(edge, size))
+
+class BitTile:
+    # Compact tile: every row is stored as an integer with the leftmost pixel
+    # as most significant bit ('#' -> 1, '.' -> 0).
+    #
+    # All eight orientations of a tile share one cache, so every orientation
+    # is computed at most once no matter how often a tile is rotated and
+    # flipped. An orientation is stored as (flipped, rotation): the original
+    # tile flipped horizontally (if flipped) and then rotated clockwise
+    # rotation times.
+
+    def __init__(self, rows: Tuple[int, ...], size: int, index: int,
+                 orientation: Tuple[bool, int] = (False, 0),
+                 orientations: Optional[Dict[Tuple[bool, int], 'BitTile']] = None):
+        self.rows = rows
+        self.size = size
+        self.index = index
+        self.orientation = orientation
 
-    def fits_permutated_below(self, other) -> Optional['Tile']:
-        for perm in other.permutations():
-            if self.fits_below(perm):
-                return perm
-        return None
+        # Cache of orientations shared by all orientations of this tile
+        self.orientations = orientations if orientations is not None else {}
+        self.orientations[orientation] = self
 
-    def fits_permutated_left(self, other) -> Optional['Tile']:
-        for perm in other.permutations():
-            if self.fits_left(perm):
-                return perm
-        return None
+        self.top = rows[0]
+        self.bottom = rows[-1]
+        self.left = sum(((row >> (size - 1)) & 1) << (size - 1 - y) for y, row in enumerate(rows))
+        self.right = sum((row & 1) << (size - 1 - y) for y, row in enumerate(rows))
+
+    @classmethod
+    def from_tile(cls, tile: Tile) -> 'BitTile':
+        rows = tuple(border_signature(''.join(line)) for line in tile.content)
+        return cls(rows, len(rows), tile.index)
+
+    def __str__(self) -> str:
+        txt = 'Tile {}\n'.format(self.index)
+        txt += '\n'.join(
+            format(row, '0{}b'.format(self.size)).replace('1', '#').replace('0', '.')
+            for row in self.rows)
+        return txt
+
+    def __eq__(self, other):
+        return self.rows == other.rows
+
+    def oriented(self, orientation: Tuple[bool, int]) -> 'BitTile':
+        if orientation not in self.orientations:
+            # Compute from original orientation
+            original = self.orientations[(False, 0)]
+            flipped, rotation = orientation
+
+            rows = original.rows
+            if flipped:
+                rows = tuple(reverse_bits(row, self.size) for row in rows)
+            for _ in range(rotation):
+                rows = rotate_rows(rows, self.size)
+
+            BitTile(rows, self.size, self.index, orientation, self.orientations)
+
+        return self.orientations[orientation]
+
+    def oriented_edges(self, orientation: Tuple[bool, int]) -> Tuple[int, int, int, int]:
+        # Top, right, bottom and left edge of an orientation, derived from the
+        # edges of the original orientation without computing its rows
+        original = self.orientations[(False, 0)]
+        top, right, bottom, left = original.top, original.right, original.bottom, original.left
+        size = self.size
+
+        flipped, rotation = orientation
+        if flipped:
+            top, right, bottom, left = (
+                reverse_bits(top, size), left, reverse_bits(bottom, size), right)
+        for _ in range(rotation):
+            top, right, bottom, left = (
+                reverse_bits(left, size), top, reverse_bits(right, size), bottom)
+
+        return top, right, bottom, left
+
+    def find_orientation(self, top: Optional[int] = None,
+                         left: Optional[int] = None) -> Optional['BitTile']:
+        # Orientation of this tile with the given top and/or left edge
+        for flipped in (False, True):
+            for rotation in range(4):
+                edges = self.oriented_edges((flipped, rotation))
+                if top is not None and edges[0] != top:
+                    continue
+                if left is not None and edges[3] != left:
+                    continue
+                return self.oriented((flipped, rotation))
 
-    def fits_permutated_right(self, other) -> Optional['Tile']:
-        for perm in other.permutations():
-            if self.fits_right(perm):
-                return perm
         return None
 
+    def rotate(self, number = 1) -> 'BitTile':
+        flipped, rotation = self.orientation
+        return self.oriented((flipped, (rotation + number) % 4))
+
+    def flip_h(self) -> 'BitTile':
+        # Flipping after rotating equals rotating in
+        # the other direction after flipping
+        flipped, rotation = self.orientation
+        return self.oriented((not flipped, (-rotation) % 4))
+
+    def flip_v(self) -> 'BitTile':
+        # Vertical flip is horizontal flip and rotation by 180 degrees
+        return self.rotate(2).flip_h()
+
+    def permutations(self) -> List['BitTile']:
+        return [ self.oriented((flipped, rotation))
+                 for flipped in (False, True) for rotation in range(4) ]
+
     def fits_above(self, other) -> bool:
         return self.top == other.bottom
 
@@ -125,34 +153,60 @@ class Tile:
     def fits_right(self, other) -> bool:
         return self.right == other.left
 
-def parse_input_file(filename):
-    tiles = []
-
-    with open(filename, 'r') as input_file:
-        content = input_file.read().split('\n')
-
-        txt = []
-
-        for line in content:
-            if line.strip() == '':
-                # Create new tile
-                index = int(''.join(txt[0]).split(' ')[1][:-1])
-                content = txt[1:]
-                tiles.append(Tile(content, index))
-                txt = []
-            else:
-                txt.append(list(line))
-
-
-    return tiles
-
-def main():
-    # Read input file
-    tiles = parse_input_file('day20_input.txt')
-
+def rotate_rows(rows: Tuple[int, ...], size: int) -> Tuple[int, ...]:
+    # Rotate clockwise: column x (read bottom to top) becomes row x
+    new_rows = []
+    for x in range(size):
+        shift = size - 1 - x
+        new_rows.append(sum(((row >> shift) & 1) << y for y, row in enumerate(rows)))
+
+    return tuple(new_rows)
+
+class EdgeIndex:
+    def __init__(self, tiles: List[BitTile]):
+        # Tile index -> canonical signatures of top, right, bottom, left border
+        self.tile_signatures: Dict[int, Tuple[int, int, int, int]] = {}
+
+        # Canonical signature -> indices of tiles having a border with it
+        self.signature_tiles: Dict[int, List[int]] = defaultdict(list)
+
+        for tile in tiles:
+            signatures = (
+                canonical_edge(tile.top, tile.size),
+                canonical_edge(tile.right, tile.size),
+                canonical_edge(tile.bottom, tile.size),
+                canonical_edge(tile.left, tile.size))
+            self.tile_signatures[tile.index] = signatures
+            for signature in signatures:
+                self.signature_tiles[signature].append(tile.index)
+
+    def neighbors(self, index: int) -> List[int]:
+        # Indices of all tiles sharing a border with tile
+        others = []
+        for signature in self.tile_signatures[index]:
+            others.extend(other for other in self.signature_tiles[signature] if other != index)
+
+        return others
+
+    def is_outer_edge(self, edge: int, size: int) -> bool:
+        # Check if no other tile has this edge (edge of the whole image)
+        return len(self.signature_tiles[canonical_edge(edge, size)]) == 1
+
+    def other_tile(self, edge: int, size: int, index: int) -> Optional[int]:
+        # Index of the tile that shares edge with tile
+        for other in self.signature_tiles[canonical_edge(edge, size)]:
+            if other != index:
+                return other
+        return None
 
-    ############ PART ONE ############
+    def matching_borders(self, index: int) -> int:
+        # Number of borders of tile that match a border of another tile
+        return sum(
+            1 for signature in self.tile_signatures[index]
+            if len(self.signature_tiles[signature]) > 1)
 
+def classify_tiles(tiles: List[BitTile],
+                   index: EdgeIndex) -> Tuple[List[BitTile], List[BitTile], List[BitTile]]:
     # Corner tiles have only 2 tiles that fit beside them in any permutation
     corner_tiles = []
 
@@ -162,20 +216,8 @@ def main():
     # Middle tiles have 4 tiles that fit all around them
     middle_tiles = []
 
-    # Check what tiles fit next to every tile
     for tile in tiles:
-        matching_tiles = 0
-        for other in (t for t in tiles if t is not tile):
-            if tile.fits_permutated_above(other) is not None:
-                matching_tiles += 1
-            if tile.fits_permutated_below(other) is not None:
-                matching_tiles += 1
-            if tile.fits_permutated_left(other) is not None:
-                matching_tiles += 1
-            if tile.fits_permutated_right(other) is not None:
-                matching_tiles += 1
-
-        print('Tile {} has {} tiles fitting next to it'.format(tile.index, matching_tiles))
+        matching_tiles = index.matching_borders(tile.index)
 
         if matching_tiles == 2:
             corner_tiles.append(tile)
@@ -191,11 +233,213 @@ def main():
             #   Multiple tiles could function as a corner tile at first look
             #   but assembly of image would not work out when inserting side
             #   and middle tiles.
-            print('error')
+            print('error: tile {} has {} tiles fitting next to it'.format(
+                tile.index, matching_tiles))
+
+    return corner_tiles, side_tiles, middle_tiles
+
+def assemble_tiles(tiles: List[BitTile], index: EdgeIndex) -> List[List[BitTile]]:
+    # Put tiles together row by row. Every tile is found by looking up the
+    # edge of its left neighbor (or of the tile above for the first tile of
+    # a row) in the edge index.
+    tiles_by_index = { tile.index: tile for tile in tiles }
+
+    # Start with a corner tile rotated so that its outer edges face up and left
+    corner_tiles, _, _ = classify_tiles(tiles, index)
+    if not corner_tiles:
+        raise ValueError('Cannot assemble image: there is no corner tile')
+    start = next((
+        perm for perm in corner_tiles[0].permutations()
+        if index.is_outer_edge(perm.top, perm.size) and index.is_outer_edge(perm.left, perm.size)))
+
+    def neighbor(tile: BitTile, top: Optional[int] = None,
+                 left: Optional[int] = None) -> Optional[BitTile]:
+        # Tile that fits below (given its top edge) or right (given its left edge)
+        edge = top if top is not None else left
+        assert edge is not None
+
+        other = index.other_tile(edge, tile.size, tile.index)
+        if other is None:
+            return None
+
+        fitting = tiles_by_index[other].find_orientation(top, left)
+        if fitting is not None:
+            return fitting
+        raise ValueError('Cannot assemble image: tile {} does not fit next to tile {}'.format(
+            other, tile.index))
+
+    grid: List[List[BitTile]] = []
+    row_start: Optional[BitTile] = start
+    while row_start is not None:
+        row = [ row_start ]
+        while True:
+            left = row[-1]
+            right = neighbor(left, left = left.right)
+            if right is None:
+                break
+            row.append(right)
+        grid.append(row)
+
+        if len(row) != len(grid[0]):
+            raise ValueError('Cannot assemble image: rows have different length')
+
+        above = row[0]
+        row_start = neighbor(above, top = above.bottom)
+
+    if sum(len(row) for row in grid) != len(tiles):
+        raise ValueError('Cannot assemble image: not all tiles were used')
+
+    return grid
+
+def stitch_image(grid: List[List[BitTile]]) -> Tuple[Tuple[int, ...], int]:
+    # Remove borders of tiles and join them into one image.
+    # Returns rows of image (as integers, leftmost pixel is the
+    # most significant bit) and width of image.
+    size = grid[0][0].size
+    inner = size - 2
+    mask = (1 << inner) - 1
+
+    rows = []
+    for tile_row in grid:
+        for y in range(1, size - 1):
+            row = 0
+            for tile in tile_row:
+                row = (row << inner) | ((tile.rows[y] >> 1) & mask)
+            rows.append(row)
+
+    return tuple(rows), inner * len(grid[0])
+
+# Pattern as rows of integers (leftmost pixel is most significant bit),
+# width and height
+Pattern = namedtuple('Pattern', 'rows width height')
+
+SEA_MONSTER = [
+    '                  # ',
+    '#    ##    ##    ###',
+    ' #  #  #  #  #  #   ',
+]
+
+def cells_to_pattern(cells: Set[Tuple[int, int]]) -> Pattern:
+    # Build pattern from set of (x, y) cells
+    min_x = min(x for x, _ in cells)
+    min_y = min(y for _, y in cells)
+    width = max(x for x, _ in cells) - min_x + 1
+    height = max(y for _, y in cells) - min_y + 1
+
+    rows = [ 0 ] * height
+    for x, y in cells:
+        rows[y - min_y] |= 1 << (width - 1 - (x - min_x))
+
+    return Pattern(tuple(rows), width, height)
+
+def pattern_orientations(lines: List[str]) -> Dict[Tuple[bool, int], Pattern]:
+    # Pattern in all eight orientations. Orientations are (flipped, rotation)
+    # as for BitTile: flipped horizontally (if flipped), then rotated
+    # clockwise rotation times.
+    cells = { (x, y) for y, line in enumerate(lines) for x, char in enumerate(line) if char == '#' }
+    if not cells:
+        raise ValueError('Pattern is empty')
+
+    orientations = {}
+    for flipped in (False, True):
+        current = { (-x, y) for x, y in cells } if flipped else cells
+        for rotation in range(4):
+            orientations[(flipped, rotation)] = cells_to_pattern(current)
+            current = { (-y, x) for x, y in current }
+
+    return orientations
+
+def find_pattern(image: Tuple[int, ...], width: int, pattern: Pattern) -> List[Tuple[int, int]]:
+    # Find top left (x, y) of every occurrence of pattern in image.
+    # For every image row and every column of the pattern the row is shifted
+    # so that the pixel in that column lands on the bit of the start position.
+    # ANDing these shifted rows tests all start positions of a row at once.
+    if pattern.width > width or pattern.height > len(image):
+        return []
+
+    # Bits of valid start positions (pattern does not stick out on the right)
+    valid = ((1 << (width - pattern.width + 1)) - 1) << (pattern.width - 1)
+
+    # Columns of set pixels in every pattern row
+    pattern_columns = [
+        [ x for x in range(pattern.width) if row & (1 << (pattern.width - 1 - x)) ]
+        for row in pattern.rows
+    ]
+
+    matches = []
+    for y in range(len(image) - pattern.height + 1):
+        candidates = valid
+        for dy, columns in enumerate(pattern_columns):
+            row = image[y + dy]
+            for x in columns:
+                candidates &= row << x
+            if not candidates:
+                break
+
+        while candidates:
+            bit = candidates.bit_length() - 1
+            matches.append((width - 1 - bit, y))
+            candidates ^= 1 << bit
+
+    return sorted(matches)
+
+def search_pattern(image: Tuple[int, ...], width: int,
+                   lines: List[str]) -> Dict[Tuple[bool, int], List[Tuple[int, int]]]:
+    # Find pattern in all orientations
+    return {
+        orientation: find_pattern(image, width, pattern)
+        for orientation, pattern in pattern_orientations(lines).items()
+    }
+
+def count_outside_matches(image: Tuple[int, ...], width: int, lines: List[str],
+                          matches: Dict[Tuple[bool, int], List[Tuple[int, int]]]) -> int:
+    # Number of set pixels of image that are not part of any match
+    covered = [ 0 ] * len(image)
+    for orientation, pattern in pattern_orientations(lines).items():
+        for x, y in matches.get(orientation, []):
+            for dy, row in enumerate(pattern.rows):
+                covered[y + dy] |= row << (width - pattern.width - x)
+
+    return sum(bin(row & ~cover).count('1') for row, cover in zip(image, covered))
+
+def parse_input_file(filename):
+    tiles = []
+
+    with open(filename, 'r') as input_file:
+        content = input_file.read().split('\n')
+
+        txt = []
+
+        for line in content:
+            if line.strip() == '':
+                if not txt:
+                    continue
+
+                # Create new tile
+                index = int(''.join(txt[0]).split(' ')[1][:-1])
+                content = txt[1:]
+                tiles.append(Tile(content, index))
+                txt = []
+            else:
+                txt.append(list(line))
+
+
+    return tiles
+
+def main():
+    # Read input file
+    tiles = [ BitTile.from_tile(tile) for tile in parse_input_file('day20_input.txt') ]
+
+
+    ############ PART ONE ############
+
+    # Index borders of all tiles and classify tiles by
+    # the number of tiles that fit next to them
+    index = EdgeIndex(tiles)
+    corner_tiles, side_tiles, middle_tiles = classify_tiles(tiles, index)
 
     # There should be exactly four corner tiles
     assert len(corner_tiles) == 4
-    assert len(side_tiles) == (math.sqrt(len(tiles)) -2) * 4
     assert len(middle_tiles) == len(tiles) - len(side_tiles) - len(corner_tiles)
 
     print('Corner Tiles: {}'.format(len(corner_tiles)))
@@ -208,11 +452,25 @@ def main():
         checksum *= corner_tile.index
     print('Corner Checksum: {}'.format(checksum))
 
-    # Create empty image
-    root = int(math.sqrt(len(tiles)))
-    image = [ [ None for x in range(root) ] for x in range(root) ]
+    # Put together image
+    grid = assemble_tiles(tiles, index)
+    image, width = stitch_image(grid)
+
+    # Side tiles make up the outer rows and columns
+    assert len(side_tiles) == 2 * (len(grid) - 2) + 2 * (len(grid[0]) - 2)
+
+    print('Assembled image of {}x{} tiles ({}x{} pixels)'.format(
+        len(grid[0]), len(grid), width, len(image)))
+
+
+    ############ PART TWO ############
+
+    # Search sea monsters in every orientation
+    matches = search_pattern(image, width, SEA_MONSTER)
+    print('Sea monsters: {}'.format(sum(len(found) for found in matches.values())))
 
-    # Now put together image ...
+    # Count pixels that are not part of a sea monster
+    print('Water roughness: {}'.format(count_outside_matches(image, width, SEA_MONSTER, matches)))
 
 if __name__ == '__main__':
     main()
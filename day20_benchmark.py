@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import day20
+from day20 import Tile
+
+def edge_count(columns: int, rows: int) -> int:
+    # Number of borders (shared and outer) in a puzzle
+    return rows * (columns + 1) + columns * (rows + 1)
+
+def minimum_tile_size(columns: int, rows: int) -> int:
+    # Smallest tile size for which there are comfortably more possible
+    # borders than borders in the puzzle, so every border can be unique
+    size = 4
+    while 2 ** (size - 2) < 4 * edge_count(columns, rows):
+        size += 1
+
+    return size
+
+def generate_puzzle(columns: int, rows: int, size: int,
+                    seed: Optional[int] = None) -> Tuple[List[Tile], List[List[int]]]:
+    # Generate a solvable puzzle of columns x rows tiles of size x size pixels.
+    # Every border is unique (in either direction) so the puzzle can only be
+    # assembled in one way. Tiles are shuffled and randomly rotated and flipped.
+    # Returns tiles and the tile indices in their original layout.
+    if columns < 2 or rows < 2:
+        raise ValueError('Puzzle must have at least 2x2 tiles')
+    if 2 ** (size - 2) < 4 * edge_count(columns, rows):
+        raise ValueError('Tile size {} is too small for {}x{} tiles (at least {} is needed)'.format(
+            size, columns, rows, minimum_tile_size(columns, rows)))
+
+    rng = random.Random(seed)
+
+    # Pixels of whole puzzle. Neighboring tiles overlap by one pixel so
+    # they share the pixels of their common border.
+    width = columns * (size - 1) + 1
+    height = rows * (size - 1) + 1
+    pixels = [ [ rng.choice('#.') for x in range(width) ] for y in range(height) ]
+
+    # Make every border unique by rerolling its inner pixels
+    # (corner pixels are part of other borders as well)
+    seen = set()
+    for line in range(rows + 1):
+        y = line * (size - 1)
+        for column in range(columns):
+            x = column * (size - 1)
+            while True:
+                border = ''.join(pixels[y][x:x + size])
+                signature = day20.canonical_edge(day20.border_signature(border), size)
+                if signature not in seen:
+                    seen.add(signature)
+                    break
+                for i in range(1, size - 1):
+                    pixels[y][x + i] = rng.choice('#.')
+    for line in range(columns + 1):
+        x = line * (size - 1)
+        for row in range(rows):
+            y = row * (size - 1)
+            while True:
+                border = ''.join(pixels[y + i][x] for i in range(size))
+                signature = day20.canonical_edge(day20.border_signature(border), size)
+                if signature not in seen:
+                    seen.add(signature)
+                    break
+                for i in range(1, size - 1):
+                    pixels[y + i][x] = rng.choice('#.')
+
+    # Cut puzzle into tiles
+    indices = rng.sample(range(1000, 1000 + 10 * columns * rows), columns * rows)
+    layout = [ indices[row * columns:(row + 1) * columns] for row in range(rows) ]
+
+    tiles = []
+    for row in range(rows):
+        for column in range(columns):
+            y = row * (size - 1)
+            x = column * (size - 1)
+            content = [ line[x:x + size] for line in pixels[y:y + size] ]
+
+            # Rotate clockwise and flip randomly
+            for _ in range(rng.randrange(4)):
+                content = [ list(line) for line in zip(*reversed(content)) ]
+            if rng.random() < 0.5:
+                content = [ list(reversed(line)) for line in content ]
+
+            tiles.append(Tile(content, layout[row][column]))
+
+    rng.shuffle(tiles)
+
+    return tiles, layout
+
+def write_puzzle(filename, tiles: List[Tile]):
+    # Write tiles in the format of the input file
+    with open(filename, 'w') as output_file:
+        for tile in tiles:
+            output_file.write('Tile {}:\n'.format(tile.index))
+            for line in tile.content:
+                output_file.write(''.join(line) + '\n')
+            output_file.write('\n')
+
+def rotate_layout(layout: List[List[int]]) -> List[List[int]]:
+    # Rotate grid of tile indices clockwise
+    return [ list(row) for row in zip(*reversed(layout)) ]
+
+def layout_transforms(layout: List[List[int]]) -> List[List[List[int]]]:
+    # All 8 rotations and flips of a grid of tile indices
+    transforms = []
+    for grid in (layout, [ list(reversed(row)) for row in layout ]):
+        for _ in range(4):
+            transforms.append(grid)
+            grid = rotate_layout(grid)
+
+    return transforms
+
+def benchmark(tiles: int, size: Optional[int] = None, seed: Optional[int] = None) -> Dict:
+    columns = max(2, math.isqrt(tiles))
+    rows = max(2, tiles // columns)
+    size = size or max(10, minimum_tile_size(columns, rows))
+
+    puzzle, layout = generate_puzzle(columns, rows, size, seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'puzzle.txt')
+        write_puzzle(filename, puzzle)
+
+        begin = time.perf_counter()
+        bit_tiles = [ day20.BitTile.from_tile(tile) for tile in day20.parse_input_file(filename) ]
+        parsed = time.perf_counter()
+
+    index = day20.EdgeIndex(bit_tiles)
+    corner_tiles, side_tiles, middle_tiles = day20.classify_tiles(bit_tiles, index)
+    classified = time.perf_counter()
+
+    grid = day20.assemble_tiles(bit_tiles, index)
+    image, width = day20.stitch_image(grid)
+    assembled = time.perf_counter()
+
+    # Assembled image may be rotated or flipped
+    assembled_layout = [ [ tile.index for tile in row ] for row in grid ]
+    expected_corners = { layout[0][0], layout[0][-1], layout[-1][0], layout[-1][-1] }
+    correct = (
+        assembled_layout in layout_transforms(layout)
+        and { tile.index for tile in corner_tiles } == expected_corners
+        and len(side_tiles) == 2 * (columns - 2) + 2 * (rows - 2)
+        and len(middle_tiles) == (columns - 2) * (rows - 2)
+        and width * len(image) == columns * rows * (size - 2) ** 2)
+
+    return {
+        'tiles': columns * rows,
+        'columns': columns,
+        'rows': rows,
+        'tile_size': size,
+        'parse_seconds': parsed - begin,
+        'classify_seconds': classified - parsed,
+        'assemble_seconds': assembled - classified,
+        'correct': correct,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description = (
+        'Time day20 BitTile parsing, EdgeIndex classification '
+        'and assembly on generated puzzles'))
+    parser.add_argument('tiles', type = int, nargs = '*', default = [ 100, 1000, 10000, 40000 ],
+                        help = 'number of tiles of generated puzzles')
+    parser.add_argument('--size', type = int,
+                        help = 'edge length of tiles (default: smallest that works, at least 10)')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--output', help = 'write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = []
+    for tiles in args.tiles:
+        result = benchmark(tiles, args.size, args.seed)
+        results.append(result)
+        print(('{:6} tiles ({:2} px): parse {:7.3f}s  classify {:7.3f}s  '
+               'assemble {:7.3f}s  {}').format(
+            result['tiles'], result['tile_size'], result['parse_seconds'],
+            result['classify_seconds'], result['assemble_seconds'],
+            'ok' if result['correct'] else 'WRONG'), file = sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent = 2)
+    else:
+        print(json.dumps(results, indent = 2))
+
+if __name__ == '__main__':
+    main()
@@ -1,212 +1,502 @@
 #!/usr/bin/env python3
 
+from typing import Deque
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Set
 from typing import Tuple
-from typing import Union
 
+import functools
+import math
+import operator
 import re
-
-class Ingredient:
-    def __init__(self, name: str, possible_allergens: List[str]):
-        self.name = name
-        self.possible_allergens = possible_allergens
-
-    def __eq__(self, other):
-        return self.name == other.name
-
-    def __repr__(self):
-        return self.name
-
-    def __str__(self):
-        if len(self.possible_allergens) == 0:
-            return self.name
-        else:
-            return '{} (Maybe: {})'.format(self.name, ', '.join(self.possible_allergens))
-
-    def add_possible_allergens(self, new_allergens: Union[str, List[str]]):
-        if isinstance(new_allergens, str):
-            self.add_possible_allergens([ new_allergens ])
-            return
-
-        for new_allergen in new_allergens:
-            if new_allergen not in self.possible_allergens:
-                self.possible_allergens.append(new_allergen)
-
-class Food:
-    def __init__(self, ingredients: List[Ingredient], definite_allergens: List[str]):
-        self.ingredients = ingredients
-        self.definite_allergens = definite_allergens
-
-    def __str__(self):
-        ingredient_names = ', '.join([ ingr.name for ingr in self.ingredients ])
-        allergen_names = ', '.join(self.definite_allergens)
-        return '{} (Definitely: {})'.format(ingredient_names, allergen_names)
-
-def read_input_file(filename) -> Tuple[List[Ingredient], List[Food]]:
-    all_ingredients: List[Ingredient] = []
-    all_foods: List[Food] = []
+from collections import deque
+from collections import namedtuple
+
+# Candidate ingredients per allergen, one valid assignment of allergens to
+# ingredients and allergens whose ingredient is not unique
+Assignment = namedtuple('Assignment', 'candidates matching ambiguous')
+
+class FoodRegistry:
+    # Ingredients and allergens are interned: every name is mapped to an
+    # integer id once and everything else only stores ids.
+
+    def __init__(self):
+        # Id -> name and name -> id
+        self.ingredient_names: List[str] = []
+        self.ingredient_ids: Dict[str, int] = {}
+        self.allergen_names: List[str] = []
+        self.allergen_ids: Dict[str, int] = {}
+
+        # Food id -> ingredient ids / allergen ids of food
+        self.food_ingredients: List[Set[int]] = []
+        self.food_allergens: List[Set[int]] = []
+
+        # Inverted indexes: ingredient id / allergen id -> food ids
+        self.ingredient_foods: List[List[int]] = []
+        self.allergen_foods: List[List[int]] = []
+
+    def ingredient_id(self, name: str) -> int:
+        if name not in self.ingredient_ids:
+            self.ingredient_ids[name] = len(self.ingredient_names)
+            self.ingredient_names.append(name)
+            self.ingredient_foods.append([])
+
+        return self.ingredient_ids[name]
+
+    def allergen_id(self, name: str) -> int:
+        if name not in self.allergen_ids:
+            self.allergen_ids[name] = len(self.allergen_names)
+            self.allergen_names.append(name)
+            self.allergen_foods.append([])
+
+        return self.allergen_ids[name]
+
+    def add_food(self, ingredients: List[str], allergens: List[str]) -> int:
+        food = len(self.food_ingredients)
+
+        ingredient_ids = { self.ingredient_id(name) for name in ingredients }
+        allergen_ids = { self.allergen_id(name) for name in allergens }
+        self.food_ingredients.append(ingredient_ids)
+        self.food_allergens.append(allergen_ids)
+
+        for ingredient in ingredient_ids:
+            self.ingredient_foods[ingredient].append(food)
+        for allergen in allergen_ids:
+            self.allergen_foods[allergen].append(food)
+
+        return food
+
+    def candidate_ingredients(self, allergen: int) -> Set[int]:
+        # Ingredients present in every food containing the allergen.
+        # Only ingredients of the smallest of these foods can be candidates,
+        # so they are numbered 0 .. k-1 and every food is intersected as a
+        # k-bit mask (instead of a mask as wide as all ingredients).
+        foods = [ self.food_ingredients[food] for food in self.allergen_foods[allergen] ]
+        remap = list(min(foods, key = len))
+        bits = { ingredient: 1 << i for i, ingredient in enumerate(remap) }
+
+        mask = (1 << len(remap)) - 1
+        for ingredients in foods:
+            mask &= functools.reduce(
+                operator.or_, (bits.get(ingredient, 0) for ingredient in ingredients), 0)
+            if not mask:
+                break
+
+        return { remap[i] for i in mask_to_ids(mask) }
+
+    def count_occurrences(self, ingredients: Iterable[int]) -> int:
+        # Number of times the ingredients appear in any food
+        return sum(len(self.ingredient_foods[ingredient]) for ingredient in ingredients)
+
+def mask_to_ids(mask: int) -> List[int]:
+    ids = []
+    while mask:
+        lowest = mask & -mask
+        ids.append(lowest.bit_length() - 1)
+        mask ^= lowest
+
+    return ids
+
+def parse_food(line: str) -> Tuple[List[str], List[str]]:
+    # Extract possible allergens in food
+    allergens_match = re.match(r'.*(\(.*\))$', line)
+    assert allergens_match is not None
+    allergens = allergens_match.group(1)[10:-1].split(', ')
+
+    # Extract ingredients
+    ingredients_match = re.match(r'(.*) \(.*', line)
+    assert ingredients_match is not None
+    ingredients = ingredients_match.group(1).strip().split(' ')
+
+    return ingredients, allergens
+
+def read_input_file(filename) -> FoodRegistry:
+    registry = FoodRegistry()
 
     with open(filename, 'r') as input_file:
-        content = input_file.read().split('\n')
-
-        for line in content:
+        for line in input_file:
             if line.strip() == '':
                 continue
 
-            # Extract possible allergens in food
-            allergens_match = re.match('.*(\(.*\))$', line)
-            assert allergens_match is not None
-            allergens = allergens_match.group(1)[10:-1].split(', ')
-
-            # Extract ingredients
-            ingredients_match = re.match('(.*) \(.*', line)
-            assert ingredients_match is not None
-            ingredients = ingredients_match.group(1).strip().split(' ')
-
-            # Create Ingredients
-            food_ingredients: List[Ingredient] = []
-            for ingr_name in ingredients:
-                ingr = None
-
-                # Check if ingredient already exists and create it if not
-                for ingr_check in all_ingredients:
-                    if ingr_check.name == ingr_name:
-                        ingr = ingr_check
-                if ingr is None:
-                    ingr = Ingredient(ingr_name, [])
-                    all_ingredients.append(ingr)
+            ingredients, allergens = parse_food(line.strip())
+            registry.add_food(ingredients, allergens)
+
+    return registry
+
+def allergen_candidates(registry: FoodRegistry) -> Dict[int, Set[int]]:
+    # Ingredients that might be responsible for an allergen are
+    # present in every food containing the allergen
+    return {
+        allergen: registry.candidate_ingredients(allergen)
+        for allergen in range(len(registry.allergen_names))
+    }
+
+def match_allergens(candidates: Dict[int, Set[int]]) -> Dict[int, int]:
+    # Find an ingredient for every allergen so that no ingredient is
+    # responsible for two allergens (maximum bipartite matching with
+    # Hopcroft-Karp). Raises ValueError if there is no such assignment.
+    allergen_match: Dict[int, Optional[int]] = { allergen: None for allergen in candidates }
+    ingredient_match: Dict[int, int] = {}
+
+    while True:
+        # Breadth-first search from all unmatched allergens, layering
+        # allergens by length of shortest alternating path
+        distance: Dict[int, float] = {}
+        queue: Deque[int] = deque()
+        for allergen, ingredient in allergen_match.items():
+            if ingredient is None:
+                distance[allergen] = 0
+                queue.append(allergen)
+
+        found_free = False
+        while queue:
+            allergen = queue.popleft()
+            for ingredient in candidates[allergen]:
+                other = ingredient_match.get(ingredient)
+                if other is None:
+                    found_free = True
+                elif other not in distance:
+                    distance[other] = distance[allergen] + 1
+                    queue.append(other)
+
+        if not found_free:
+            break
+
+        # Depth-first search along layers for vertex-disjoint augmenting paths.
+        # Uses explicit stack to support long paths.
+        for root in [ a for a, ingredient in allergen_match.items() if ingredient is None ]:
+            stack: List[Tuple[int, Iterator[int]]] = [ (root, iter(candidates[root])) ]
+            path: List[int] = []
+
+            while stack:
+                allergen, ingredients = stack[-1]
+                for ingredient in ingredients:
+                    other = ingredient_match.get(ingredient)
+                    if other is None:
+                        # Augment: flip matching along path
+                        path.append(ingredient)
+                        for (path_allergen, _), path_ingredient in zip(stack, path):
+                            allergen_match[path_allergen] = path_ingredient
+                            ingredient_match[path_ingredient] = path_allergen
+                        stack = []
+                        break
+                    if distance.get(other) == distance[allergen] + 1:
+                        path.append(ingredient)
+                        stack.append((other, iter(candidates[other])))
+                        break
+                else:
+                    # Dead end, never visit again in this phase
+                    distance[allergen] = math.inf
+                    stack.pop()
+                    if path:
+                        path.pop()
+
+    unmatched = [
+        allergen for allergen, ingredient in allergen_match.items() if ingredient is None ]
+    if unmatched:
+        raise ValueError('No ingredient can be found for allergens {}'.format(unmatched))
+
+    return { allergen: ingredient for allergen, ingredient in allergen_match.items()
+             if ingredient is not None }
+
+def ambiguous_allergens(candidates: Dict[int, Set[int]], matching: Dict[int, int]) -> Set[int]:
+    # Allergens whose ingredient differs in another valid assignment.
+    # Allergen a "can give up" its ingredient to allergen b if a has b's ingredient
+    # as a candidate. An allergen is ambiguous if it lies on a cycle of such
+    # moves or if it can reach an allergen with an unused candidate.
+    ingredient_allergen = { ingredient: allergen for allergen, ingredient in matching.items() }
+
+    # Edges allergen -> allergen whose ingredient it could take
+    edges: Dict[int, List[int]] = { allergen: [] for allergen in candidates }
+    reverse_edges: Dict[int, List[int]] = { allergen: [] for allergen in candidates }
+    ambiguous: Set[int] = set()
+    for allergen, ingredients in candidates.items():
+        for ingredient in ingredients:
+            if ingredient == matching[allergen]:
+                continue
+            other = ingredient_allergen.get(ingredient)
+            if other is None:
+                ambiguous.add(allergen)
+            else:
+                edges[allergen].append(other)
+                reverse_edges[other].append(allergen)
+
+    # Everything that can reach an allergen with an unused candidate
+    queue = deque(ambiguous)
+    while queue:
+        allergen = queue.popleft()
+        for other in reverse_edges[allergen]:
+            if other not in ambiguous:
+                ambiguous.add(other)
+                queue.append(other)
+
+    # Everything on a cycle (strongly connected components with more than
+    # one allergen, found with iterative Tarjan)
+    index: Dict[int, int] = {}
+    lowlink: Dict[int, int] = {}
+    on_stack: Set[int] = set()
+    component_stack: List[int] = []
+    for root in candidates:
+        if root in index:
+            continue
+
+        work: List[Tuple[int, Iterator[int]]] = [ (root, iter(edges[root])) ]
+        index[root] = lowlink[root] = len(index)
+        component_stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            allergen, successors = work[-1]
+            for other in successors:
+                if other not in index:
+                    index[other] = lowlink[other] = len(index)
+                    component_stack.append(other)
+                    on_stack.add(other)
+                    work.append((other, iter(edges[other])))
+                    break
+                if other in on_stack:
+                    lowlink[allergen] = min(lowlink[allergen], index[other])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[allergen])
+
+                if lowlink[allergen] == index[allergen]:
+                    component = []
+                    while True:
+                        other = component_stack.pop()
+                        on_stack.remove(other)
+                        component.append(other)
+                        if other == allergen:
+                            break
+                    if len(component) > 1:
+                        ambiguous.update(component)
+
+    return ambiguous
+
+def solve_allergens(registry: FoodRegistry) -> Assignment:
+    candidates = allergen_candidates(registry)
+    matching = match_allergens(candidates)
+    return Assignment(candidates, matching, ambiguous_allergens(candidates, matching))
+
+def stage_ids(names: List[str], ids: Dict[str, int]) -> Tuple[List[str], Set[int]]:
+    # Ids of names without interning them. Names seen for the first time are
+    # returned as well, they get the next ids in order once they are interned.
+    new_names: Dict[str, int] = {}
+    result = set()
+    for name in names:
+        if name in ids:
+            result.add(ids[name])
+        else:
+            result.add(new_names.setdefault(name, len(ids) + len(new_names)))
+
+    return list(new_names), result
+
+class AllergenSolver:
+    # Solver that receives foods one at a time and can be queried at any time.
+    # Only names, occurrence counters and candidate sets are kept (not the
+    # foods themselves). Candidate ingredients of every allergen only ever
+    # shrink, so adding a food costs time proportional to its size plus the
+    # candidates it removes (each of which can only be removed once).
+    #
+    # Allergens are resolved by constraint propagation: an allergen with a
+    # single candidate left (not counting ingredients responsible for other
+    # allergens) is resolved, which may resolve further allergens.
+    #
+    # A food contradicting earlier foods is rejected with ValueError and
+    # leaves the solver unchanged.
+
+    def __init__(self):
+        # Id -> name and name -> id
+        self.ingredient_names: List[str] = []
+        self.ingredient_ids: Dict[str, int] = {}
+        self.allergen_names: List[str] = []
+        self.allergen_ids: Dict[str, int] = {}
+
+        # Ingredient id -> number of foods containing it
+        self.occurrences: List[int] = []
+
+        # Allergen id -> candidate ingredient ids and the inverse
+        self.candidates: Dict[int, Set[int]] = {}
+        self.ingredient_allergens: List[Set[int]] = []
+
+        # Resolved allergen id -> ingredient id and the inverse
+        self.allergen_ingredient: Dict[int, int] = {}
+        self.ingredient_allergen: Dict[int, int] = {}
+
+        # Occurrences of all ingredients and of ingredients that
+        # might contain an allergen
+        self.total_occurrences = 0
+        self.unhealthy_occurrences = 0
+
+    def add_food(self, ingredients: List[str], allergens: List[str]):
+        new_ingredients, food_ingredients = stage_ids(ingredients, self.ingredient_ids)
+        new_allergens, food_allergens = stage_ids(allergens, self.allergen_ids)
+
+        # Check food against earlier foods without changing anything
+        narrowed = self._narrow_candidates(food_ingredients, food_allergens)
+        resolutions = self._propagate(narrowed, new_allergens)
+
+        # Accept food
+        for name in new_ingredients:
+            self.ingredient_ids[name] = len(self.ingredient_names)
+            self.ingredient_names.append(name)
+            self.occurrences.append(0)
+            self.ingredient_allergens.append(set())
+        for name in new_allergens:
+            self.allergen_ids[name] = len(self.allergen_names)
+            self.allergen_names.append(name)
+
+        self.total_occurrences += len(food_ingredients)
+        for ingredient in food_ingredients:
+            self.occurrences[ingredient] += 1
+            if self.ingredient_allergens[ingredient]:
+                self.unhealthy_occurrences += 1
+
+        for allergen, candidates in narrowed.items():
+            previous = self.candidates.get(allergen, set())
+            for ingredient in candidates - previous:
+                self._add_candidate(allergen, ingredient)
+            for ingredient in previous - candidates:
+                self._remove_candidate(allergen, ingredient)
+            self.candidates[allergen] = candidates
+
+        for allergen, ingredient in resolutions.items():
+            self.allergen_ingredient[allergen] = ingredient
+            self.ingredient_allergen[ingredient] = allergen
+
+    def _narrow_candidates(self, food_ingredients: Set[int],
+                           food_allergens: Set[int]) -> Dict[int, Set[int]]:
+        # New candidates of allergens in food
+        narrowed: Dict[int, Set[int]] = {}
+        for allergen in food_allergens:
+            if allergen not in self.candidates:
+                narrowed[allergen] = set(food_ingredients)
+                continue
 
-                # Add possible allergens to ingredient
-                ingr.add_possible_allergens(allergens)
-                food_ingredients.append(ingr)
+            # Intersection only iterates over the smaller set
+            candidates = self.candidates[allergen] & food_ingredients
+            if allergen in self.allergen_ingredient and \
+                    self.allergen_ingredient[allergen] not in candidates:
+                raise ValueError('Food contradicts ingredient found for allergen "{}"'.format(
+                    self.allergen_names[allergen]))
+            if len(candidates) < len(self.candidates[allergen]):
+                narrowed[allergen] = candidates
+
+        return narrowed
+
+    def _propagate(self, narrowed: Dict[int, Set[int]],
+                   new_allergens: List[str]) -> Dict[int, int]:
+        # Allergens resolved by the narrowed candidates (allergen -> ingredient)
+        resolutions: Dict[int, int] = {}
+        resolved_ingredients: Set[int] = set()
+
+        def candidates(allergen: int) -> Set[int]:
+            return narrowed[allergen] if allergen in narrowed else self.candidates[allergen]
+
+        queue = deque(narrowed)
+        while queue:
+            allergen = queue.popleft()
+            if allergen in self.allergen_ingredient or allergen in resolutions:
+                continue
 
-            # Create food
-            food = Food(food_ingredients, allergens)
-            all_foods.append(food)
+            options = [
+                ingredient for ingredient in candidates(allergen)
+                if ingredient not in self.ingredient_allergen
+                and ingredient not in resolved_ingredients
+            ]
+            if not options:
+                names = self.allergen_names
+                name = names[allergen] if allergen < len(names) else \
+                    new_allergens[allergen - len(names)]
+                raise ValueError('No ingredient left for allergen "{}"'.format(name))
+            if len(options) > 1:
+                continue
 
-    return all_ingredients, all_foods
+            # Resolved, other allergens might now be resolved as well
+            ingredient = options[0]
+            resolutions[allergen] = ingredient
+            resolved_ingredients.add(ingredient)
+            if ingredient < len(self.ingredient_allergens):
+                queue.extend(self.ingredient_allergens[ingredient])
+            queue.extend(other for other in narrowed if ingredient in narrowed[other])
+
+        return resolutions
+
+    def _add_candidate(self, allergen: int, ingredient: int):
+        if not self.ingredient_allergens[ingredient]:
+            self.unhealthy_occurrences += self.occurrences[ingredient]
+        self.ingredient_allergens[ingredient].add(allergen)
+
+    def _remove_candidate(self, allergen: int, ingredient: int):
+        self.ingredient_allergens[ingredient].discard(allergen)
+        if not self.ingredient_allergens[ingredient]:
+            self.unhealthy_occurrences -= self.occurrences[ingredient]
+
+    def resolved(self) -> Dict[str, str]:
+        # Ingredient name -> allergen name of all resolved allergens
+        return {
+            self.ingredient_names[ingredient]: self.allergen_names[allergen]
+            for allergen, ingredient in self.allergen_ingredient.items()
+        }
+
+    def healthy_ingredients(self) -> List[str]:
+        return [
+            name for ingredient, name in enumerate(self.ingredient_names)
+            if not self.ingredient_allergens[ingredient]
+        ]
+
+    def healthy_occurrences(self) -> int:
+        return self.total_occurrences - self.unhealthy_occurrences
+
+    def solve(self) -> Assignment:
+        # Full assignment (including allergens propagation cannot resolve)
+        matching = match_allergens(self.candidates)
+        return Assignment(self.candidates, matching, ambiguous_allergens(self.candidates, matching))
 
 def main():
     # Read input file
-    all_ingredients, all_foods = read_input_file('day21_input.txt')
-
-    # Create list of all allergens
-    all_allergens = []
-    for food in all_foods:
-        for food_allergen in food.definite_allergens:
-            if food_allergen not in all_allergens:
-                all_allergens.append(food_allergen)
-    all_allergens.reverse()
-
-    #for ingr in all_ingredients:
-    #    print('Ingredient: {}'.format(ingr))
-    #for food in all_foods:
-    #    print('Food: {}'.format(food))
-    #for allergen in all_allergens:
-    #    print('Allergen: {}'.format(allergen))
-    #print()
-
-    ingredient_allergen: Dict[str, str] = dict()
-
-    # Go through all allergens
-    changed_something = True
-    while changed_something:
-        changed_something = False
-
-        for allergen in all_allergens:
-            # Get all foods that contain this allergen
-            affected_foods = []
-            for food in all_foods:
-                if allergen in food.definite_allergens:
-                    affected_foods.append(food)
-
-            # Get all ingredients that might be responsible for this allergen
-            possible_ingredients = []
-            for food in affected_foods:
-                for ingredient in food.ingredients:
-                    if ingredient not in possible_ingredients:
-                        possible_ingredients.append(ingredient)
-
-            # Search the ingredient responsible for the allergen
-            responsible_ingredient = None
-
-            # If there is a food that has only one ingredient this
-            # ingredient must be responsible for the allergen
-            for food in affected_foods:
-                if len(food.ingredients) == 1:
-                    responsible_ingredient = food.ingredients[0]
-
-            # Check which ingredient is present in every food
-            if responsible_ingredient is None:
-                responsible_ingredients = []
-                for ingredient in possible_ingredients:
-                    contained_in_all_foods = True
-                    for food in affected_foods:
-                        if ingredient not in food.ingredients:
-                            contained_in_all_foods = False
-
-                    if contained_in_all_foods:
-                        responsible_ingredients.append(ingredient)
-
-                if len(responsible_ingredients) == 1:
-                    responsible_ingredient = responsible_ingredients[0]
+    registry = read_input_file('day21_input.txt')
 
+    # Assign every allergen to exactly one ingredient
+    assignment = solve_allergens(registry)
 
-            if responsible_ingredient is not None:
-                changed_something = True
-
-                print('"{}" is responsible for "{}"'.format(responsible_ingredient.name, allergen))
-                ingredient_allergen[responsible_ingredient.name] = allergen
-
-                # Ingredient definitely contains allergen and nothing else.
-                responsible_ingredient.possible_allergens = [ allergen ]
-
-                # No other ingredient contains allergen
-                for other_ingredient in all_ingredients:
-                    if other_ingredient is responsible_ingredient:
-                        continue
-                    if allergen in other_ingredient.possible_allergens:
-                        other_ingredient.possible_allergens.remove(allergen)
-
-                # Remove ingredient
-                all_ingredients.remove(responsible_ingredient)
-
-                # Remove allergen from food
-                for food in affected_foods:
-                    food.definite_allergens.remove(allergen)
-
-                # Remove ingredient from food
-                for food in all_foods:
-                    if responsible_ingredient in food.ingredients:
-                        food.ingredients.remove(responsible_ingredient)
+    ingredient_allergen: Dict[str, str] = dict()
+    for allergen, ingredient in assignment.matching.items():
+        ingredient_name = registry.ingredient_names[ingredient]
+        allergen_name = registry.allergen_names[allergen]
 
+        if allergen in assignment.ambiguous:
+            print('"{}" might be responsible for "{}" (ambiguous)'.format(
+                ingredient_name, allergen_name))
+        else:
+            print('"{}" is responsible for "{}"'.format(ingredient_name, allergen_name))
+        ingredient_allergen[ingredient_name] = allergen_name
 
     print()
 
-    # Now we have removed all allergens and ingredients we
-    # can map with certainty.
-    #for ingr in all_ingredients:
-    #    print('Ingredient: {}'.format(ingr))
-    #for food in all_foods:
-    #    print('Food: {}'.format(food))
-    #for allergen in all_allergens:
-    #    print('Allergen: {}'.format(allergen))
-    #print()
-
-    healthy_ingredients = [ingr for ingr in all_ingredients if len(ingr.possible_allergens) == 0]
-    healthy_ingredient_names = [ingr.name for ingr in healthy_ingredients]
+    # Ingredients that cannot be responsible for any
+    # allergen are healthy
+    unhealthy: Set[int] = set()
+    for ingredients in assignment.candidates.values():
+        unhealthy |= ingredients
+
+    healthy_ingredients = [
+        ingr for ingr in range(len(registry.ingredient_names)) if ingr not in unhealthy
+    ]
+    healthy_ingredient_names = [ registry.ingredient_names[ingr] for ingr in healthy_ingredients ]
     print('Healty ingredient: {}'.format(healthy_ingredient_names))
     print()
 
     ############ PART ONE ############
 
     # Count number of occurrences of healthy ingredients
-    healthy_occurrences = 0
-    for ingr in healthy_ingredients:
-        for food in all_foods:
-            if ingr in food.ingredients:
-                healthy_occurrences += 1
+    healthy_occurrences = registry.count_occurrences(healthy_ingredients)
     print('Healthy ingredients occur {} times'.format(healthy_occurrences))
 
 
@@ -1,12 +1,459 @@
 #!/usr/bin/env python3
 
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Optional
 from typing import Set
 from typing import Tuple
 
+import argparse
+import itertools
+import math
+import os
+import random
 import re
+import time
+from collections import OrderedDict
+from collections import deque
+from collections import namedtuple
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+
+# Outcome of one game. winner is None if the game did not finish
+# within the maximum number of rounds.
+GameResult = namedtuple('GameResult', 'winner score rounds sub_games')
+
+# Outcomes of Combat and recursive Combat for one deal
+DealResult = namedtuple('DealResult', 'index combat recursive')
+
+# Polynomial hashing of decks modulo 2^64 (masking is a lot cheaper
+# than taking the remainder of a prime). The base has to be odd.
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+HASH_BASE = 0x1d8e4e27c47d124f
+
+# HASH_POWERS[i] == HASH_BASE ** i & HASH_MASK (grown on demand)
+HASH_POWERS = [ 1 ]
+
+def hash_power(exponent: int) -> int:
+    while len(HASH_POWERS) <= exponent:
+        HASH_POWERS.append(HASH_POWERS[-1] * HASH_BASE & HASH_MASK)
+    return HASH_POWERS[exponent]
+
+HASH_BASE_SQUARED = HASH_BASE * HASH_BASE & HASH_MASK
+
+# HASH_BASE * HASH_BASE_INVERSE & HASH_MASK == 1 (exists as the base is odd)
+HASH_BASE_INVERSE = pow(HASH_BASE, -1, 1 << HASH_BITS)
+
+class Deck(deque):
+    # Deck of cards with the top card on the left. Drawing from the top and
+    # adding to the bottom are both O(1).
+    #
+    # The deck keeps a polynomial hash of its cards
+    #   hash = sum(card_i * HASH_BASE ** (len - 1 - i)) & HASH_MASK
+    # Adding and removing cards at either end updates the hash in O(1) per
+    # card. All other ways of changing the deck inherited from deque
+    # recompute the hash from scratch, so the hash is always correct.
+
+    __slots__ = ('hash',)
+
+    def __init__(self, cards: Iterable[int] = ()):
+        super().__init__(cards)
+        self.rehash()
+
+    def rehash(self):
+        value = 0
+        for card in self:
+            value = (value * HASH_BASE + card) & HASH_MASK
+        self.hash = value
+
+    def draw(self) -> int:
+        card = deque.popleft(self)
+        try:
+            power = HASH_POWERS[len(self)]
+        except IndexError:
+            power = hash_power(len(self))
+        self.hash = (self.hash - card * power) & HASH_MASK
+        return card
+
+    popleft = draw
+
+    def append(self, x: int):
+        deque.append(self, x)
+        self.hash = (self.hash * HASH_BASE + x) & HASH_MASK
+
+    def appendleft(self, x: int):
+        self.hash = (self.hash + x * hash_power(len(self))) & HASH_MASK
+        deque.appendleft(self, x)
+
+    def pop(self) -> int:
+        card = deque.pop(self)
+        self.hash = (self.hash - card) * HASH_BASE_INVERSE & HASH_MASK
+        return card
+
+    def extend(self, iterable: Iterable[int]):
+        for card in list(iterable):
+            self.append(card)
+
+    def extendleft(self, iterable: Iterable[int]):
+        for card in list(iterable):
+            self.appendleft(card)
+
+    def clear(self):
+        deque.clear(self)
+        self.hash = 0
+
+    def collect(self, first: int, second: int):
+        # Add both cards of a won round to the bottom
+        deque.extend(self, (first, second))
+        self.hash = (self.hash * HASH_BASE_SQUARED + first * HASH_BASE + second) & HASH_MASK
+
+    def insert(self, i: int, x: int):
+        deque.insert(self, i, x)
+        self.rehash()
+
+    def remove(self, value: int):
+        deque.remove(self, value)
+        self.rehash()
+
+    def reverse(self):
+        deque.reverse(self)
+        self.rehash()
+
+    def rotate(self, n: int = 1):
+        deque.rotate(self, n)
+        self.rehash()
+
+    def __setitem__(self, key, value):
+        deque.__setitem__(self, key, value)
+        self.rehash()
+
+    def __delitem__(self, key):
+        deque.__delitem__(self, key)
+        self.rehash()
+
+    def __iadd__(self, other: Iterable[int]) -> 'Deck':
+        self.extend(other)
+        return self
+
+    def __imul__(self, n: int) -> 'Deck':
+        deque.__imul__(self, n)
+        self.rehash()
+        return self
+
+    def __add__(self, other: Iterable[int]) -> 'Deck':
+        return Deck(itertools.chain(self, other))
+
+    def __mul__(self, n: int) -> 'Deck':
+        return Deck(list(self) * n)
+
+    __rmul__ = __mul__
+
+    def copy(self) -> 'Deck':
+        return Deck(self)
+
+    __copy__ = copy
+
+    def sub_deck(self, count: int) -> 'Deck':
+        # New deck of the top count cards (copied only once)
+        return Deck(itertools.islice(self, count))
+
+# Cards of both players
+GameState = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+class StateHistory:
+    # Deck configurations already seen in a game of recursive Combat.
+    # Only a fingerprint of both deck hashes is kept per configuration.
+    # With verify the actual cards are kept as well, so that fingerprint
+    # collisions are not mistaken for repeated configurations.
+
+    def __init__(self, verify: bool = False):
+        self.verify = verify
+        self.fingerprints: Set[int] = set()
+        self.states: Dict[int, List[GameState]] = {}
+
+    def add(self, deck1: Deck, deck2: Deck) -> bool:
+        # Record configuration and return whether it has been seen before
+        return self.add_fingerprint(deck1.hash << HASH_BITS | deck2.hash, deck1, deck2)
+
+    def add_fingerprint(self, fingerprint: int, deck1: Deck, deck2: Deck) -> bool:
+        # Same as add() for a fingerprint computed by the caller
+        if not self.verify:
+            # Fingerprint was seen before if adding it does not grow the set
+            fingerprints = self.fingerprints
+            seen = len(fingerprints)
+            fingerprints.add(fingerprint)
+            return len(fingerprints) == seen
+
+        state = (tuple(deck1), tuple(deck2))
+        states = self.states.setdefault(fingerprint, [])
+        if state in states:
+            return True
+        states.append(state)
+        return False
+
+class SubGameCache:
+    # Winners of sub-games of recursive Combat by their starting decks,
+    # shared by all games of one recursion tree. Holds at most maxsize
+    # entries and evicts the least recently used one first.
+    #
+    # Sub-games in which player 1 holds the highest card and that card is
+    # higher than the number of cards in the game are not played at all:
+    # The card can never start a sub-game, so player 1 never loses it and
+    # the game can only end with player 1 winning.
+
+    def __init__(self, maxsize: int = 1 << 16):
+        self.maxsize = maxsize
+        self.winners: OrderedDict = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def lookup(self, start: GameState) -> Optional[int]:
+        # Winner of sub-game starting with the given cards if it is known
+        # without playing it
+        cards1, cards2 = start
+        highest = max(cards1)
+        if highest > max(cards2) and highest > len(cards1) + len(cards2):
+            self.skipped += 1
+            return 1
+
+        if start in self.winners:
+            self.hits += 1
+            self.winners.move_to_end(start)
+            return self.winners[start]
+
+        self.misses += 1
+        return None
 
-def read_input_file(filename):
+    def store(self, start: GameState, winner: int):
+        self.winners[start] = winner
+        if len(self.winners) > self.maxsize:
+            self.winners.popitem(last = False)
+
+    def play(self, deck1: Deck, deck2: Deck, game_id: int, verify: bool = False) -> int:
+        start = (tuple(deck1), tuple(deck2))
+        winner = self.lookup(start)
+        if winner is None:
+            winner = play_recursive_combat(deck1, deck2, game_id, verify, self)
+            self.store(start, winner)
+
+        return winner
+
+class GameFrame:
+    # State of one (sub-)game of recursive Combat on the explicit stack
+    # of RecursiveCombat
+
+    def __init__(self, deck1: Deck, deck2: Deck, game_id: int, depth: int,
+                 verify: bool = False, start: Optional[GameState] = None):
+        self.deck1 = deck1
+        self.deck2 = deck2
+        self.game_id = game_id
+        self.depth = depth
+        self.history = StateHistory(verify)
+        self.rounds = 0
+
+        # Cards of current round while waiting for the sub-game to finish
+        self.pending: Optional[Tuple[int, int]] = None
+
+        # Starting cards to store the winner in the cache with
+        self.start = start
+
+    def play(self, max_rounds: Optional[int]) -> Tuple[Optional[int], Optional[Tuple[int, int]]]:
+        # Play rounds until the game ends, until a sub-game has to be played
+        # or until max_rounds rounds have been played. Returns the winner of
+        # the game and the cards of the round waiting for a sub-game
+        # (both None if the game is suspended).
+        #
+        # This is the hot loop: Deck.draw(), Deck.collect() and
+        # StateHistory.add() are inlined and the deck hashes are kept in
+        # locals until the loop ends. The powers needed are computed when
+        # the game is created.
+        deck1 = self.deck1
+        deck2 = self.deck2
+        fingerprints = None if self.history.verify else self.history.fingerprints
+        popleft = deque.popleft
+        append = deque.append
+
+        hash1 = deck1.hash
+        hash2 = deck2.hash
+        rounds = 0
+        limit = max_rounds if max_rounds is not None else math.inf
+        try:
+            while rounds < limit:
+                # Repeated configuration ends game in a win for player 1
+                fingerprint = hash1 << HASH_BITS | hash2
+                if fingerprints is None:
+                    if self.history.add_fingerprint(fingerprint, deck1, deck2):
+                        return 1, None
+                elif fingerprint in fingerprints:
+                    return 1, None
+                else:
+                    fingerprints.add(fingerprint)
+
+                card1 = popleft(deck1)
+                card2 = popleft(deck2)
+                rounds += 1
+                hash1 = (hash1 - card1 * HASH_POWERS[len(deck1)]) & HASH_MASK
+                hash2 = (hash2 - card2 * HASH_POWERS[len(deck2)]) & HASH_MASK
+
+                # Winner of round is determined by a sub-game
+                if len(deck1) >= card1 and len(deck2) >= card2:
+                    return None, (card1, card2)
+
+                # The winner of the round is the player with the higher-value
+                # card and a player collecting all cards wins the game
+                if card1 > card2:
+                    append(deck1, card1)
+                    append(deck1, card2)
+                    hash1 = (hash1 * HASH_BASE_SQUARED + card1 * HASH_BASE + card2) & HASH_MASK
+                    if not deck2:
+                        return 1, None
+                else:
+                    append(deck2, card2)
+                    append(deck2, card1)
+                    hash2 = (hash2 * HASH_BASE_SQUARED + card2 * HASH_BASE + card1) & HASH_MASK
+                    if not deck1:
+                        return 2, None
+
+            return None, None
+        finally:
+            deck1.hash = hash1
+            deck2.hash = hash2
+            self.rounds += rounds
+
+class RecursiveCombat:
+    # Iterative engine for recursive Combat. Instead of recursing for every
+    # sub-game, the games being played are kept on an explicit stack, so the
+    # nesting depth is not limited by the Python call stack.
+    #
+    # run() can be given a budget of rounds after which it suspends the game.
+    # Calling run() again resumes the game where it stopped.
+
+    def __init__(self, deck1: Deck, deck2: Deck, verify: bool = False,
+                 cache: Optional[SubGameCache] = None):
+        self.verify = verify
+        self.cache = cache
+        self.stack: List[GameFrame] = [ GameFrame(deck1, deck2, 1, 0, verify) ]
+        self.games = 1
+        self.winner: Optional[int] = None
+
+        # No deck can hold more than all cards
+        hash_power(len(deck1) + len(deck2))
+
+        # Games started and rounds played on every nesting depth
+        self.depth_games: List[int] = [ 1 ]
+        self.depth_rounds: List[int] = [ 0 ]
+
+    @property
+    def finished(self) -> bool:
+        return self.winner is not None
+
+    @property
+    def max_depth(self) -> int:
+        return len(self.depth_games) - 1
+
+    def run(self, max_rounds: Optional[int] = None) -> Optional[int]:
+        # Play until the game is finished (returning the winner) or until
+        # max_rounds rounds have been played (returning None)
+        rounds = 0
+        while self.stack:
+            if max_rounds is None:
+                rounds += self.play_rounds(None)
+            elif rounds < max_rounds:
+                rounds += self.play_rounds(max_rounds - rounds)
+            else:
+                return None
+
+        return self.winner
+
+    def play_rounds(self, max_rounds: Optional[int]) -> int:
+        # Play rounds of the game on top of the stack until it ends, until a
+        # sub-game has to be played or until max_rounds rounds have been
+        # played. Returns number of rounds played.
+        frame = self.stack[-1]
+        played = frame.rounds
+        winner, sub_game = frame.play(max_rounds)
+        rounds = frame.rounds - played
+        self.depth_rounds[frame.depth] += rounds
+
+        if winner is not None:
+            self.end_game(winner)
+        elif sub_game is not None:
+            self.play_sub_game(frame, *sub_game)
+
+        return rounds
+
+    def play_sub_game(self, frame: GameFrame, card1: int, card2: int):
+        # Winner of round is determined by a sub-game. It is either known
+        # from the cache or the sub-game is started.
+        frame.pending = (card1, card2)
+        deck1 = frame.deck1.sub_deck(card1)
+        deck2 = frame.deck2.sub_deck(card2)
+
+        start = None
+        if self.cache is not None:
+            start = (tuple(deck1), tuple(deck2))
+            winner = self.cache.lookup(start)
+            if winner is not None:
+                self.finish_round(frame, winner)
+                return
+
+        self.start_game(deck1, deck2, frame.depth + 1, start)
+
+    def start_game(self, deck1: Deck, deck2: Deck, depth: int, start: Optional[GameState]):
+        self.games += 1
+        if depth == len(self.depth_games):
+            self.depth_games.append(0)
+            self.depth_rounds.append(0)
+        self.depth_games[depth] += 1
+
+        self.stack.append(GameFrame(deck1, deck2, self.games, depth, self.verify, start))
+
+    def finish_round(self, frame: GameFrame, round_winner: int):
+        # Give cards of round to its winner. Ending a sub-game can finish
+        # the round of the enclosing game and so on, so this loops instead
+        # of recursing.
+        while True:
+            assert frame.pending is not None
+            card1, card2 = frame.pending
+            frame.pending = None
+
+            if round_winner == 1:
+                frame.deck1.collect(card1, card2)
+            else:
+                frame.deck2.collect(card2, card1)
+
+            # If a player collects all cards they win
+            if frame.deck1 and frame.deck2:
+                return
+            round_winner = 1 if frame.deck1 else 2
+
+            if not self.pop_game(round_winner):
+                return
+            frame = self.stack[-1]
+
+    def end_game(self, winner: int):
+        if self.pop_game(winner):
+            self.finish_round(self.stack[-1], winner)
+
+    def pop_game(self, winner: int) -> bool:
+        # Remove finished game from stack and return whether
+        # there is an enclosing game waiting for its winner
+        frame = self.stack.pop()
+        if self.cache is not None and frame.start is not None:
+            self.cache.store(frame.start, winner)
+
+        if not self.stack:
+            self.winner = winner
+            return False
+        return True
+
+def read_input_file(filename) -> Tuple[Deck, Deck]:
     decks: List[List[int]] = []
 
     with open(filename, 'r') as input_file:
@@ -26,26 +473,29 @@ def read_input_file(filename):
                 # Content of deck
                 current_deck.append(int(line))
 
-    return decks[0], decks[1]
+    return Deck(decks[0]), Deck(decks[1])
 
-def draw(deck: List[int]):
+def draw(deck: Deck) -> Optional[int]:
     if len(deck) == 0:
         return None
-    return deck.pop(0)
+    return deck.draw()
 
-def play_combat_round(deck1: List[int], deck2: List[int]) -> None:
+def play_combat_round(deck1: Deck, deck2: Deck) -> None:
     card1 = draw(deck1)
     card2 = draw(deck2)
 
     winner = deck1 if card1 > card2 else deck2
-    winner.append(max((card1, card2)))
-    winner.append(min((card1, card2)))
+    winner.collect(max((card1, card2)), min((card1, card2)))
 
-def play_combat(deck1: List[int], deck2: List[int]) -> None:
+def play_combat(deck1: Deck, deck2: Deck, max_rounds: Optional[int] = None) -> int:
+    # Returns number of rounds played. Combat can go on forever, so
+    # the game can be stopped after max_rounds rounds.
     rounds_played = 0
 
     # Play until someone wins
     while len(deck1) > 0 and len(deck2) > 0:
+        if max_rounds is not None and rounds_played >= max_rounds:
+            break
         rounds_played += 1
         play_combat_round(deck1, deck2)
 
@@ -54,8 +504,11 @@ def play_combat(deck1: List[int], deck2: List[int]) -> None:
         #print('Player 2: {}'.format(', '.join('{}'.format(n) for n in deck2)))
         #print()
 
-def play_recursive_combat(deck1: List[int], deck2: List[int], game_id = 1):
-    previous: Set[Tuple[Tuple[int, ...], Tuple[int, ...]]] = set()
+    return rounds_played
+
+def play_recursive_combat(deck1: Deck, deck2: Deck, game_id = 1, verify = False,
+                          cache: Optional[SubGameCache] = None):
+    previous = StateHistory(verify)
 
     # Printing of status slows down execution significantly
     verbose = False
@@ -77,16 +530,15 @@ def play_recursive_combat(deck1: List[int], deck2: List[int], game_id = 1):
         # If there was a previous round in this game that had exactly
         # the same cards in the same order in the same players' decks,
         # THE GAME instantly ends in a win for player1
-        if (tuple(deck1), tuple(deck2)) in previous:
+        if previous.add(deck1, deck2):
             # Player 1 wins
             if verbose:
                 print('Deck configuration already happened - Player 1 wins game!\n')
             return 1
-        previous.add((tuple(deck1), tuple(deck2)))
 
         # Draw cards
-        card1 = deck1.pop(0)
-        card2 = deck2.pop(0)
+        card1 = deck1.draw()
+        card2 = deck2.draw()
 
         if verbose:
             print('Player 1 plays: {:2}'.format(card1))
@@ -97,13 +549,17 @@ def play_recursive_combat(deck1: List[int], deck2: List[int], game_id = 1):
             # as the value of the card they drew - winner of round is determined
             # by playing new game of recursive combat.
 
-            deck1_recurse = deck1.copy()[:card1]
-            deck2_recurse = deck2.copy()[:card2]
+            deck1_recurse = deck1.sub_deck(card1)
+            deck2_recurse = deck2.sub_deck(card2)
 
             if verbose:
                 print('Playing a sub-game to determine the winner ...\n')
 
-            round_winner_id = play_recursive_combat(deck1_recurse, deck2_recurse, game_id + 1)
+            if cache is None:
+                round_winner_id = play_recursive_combat(
+                    deck1_recurse, deck2_recurse, game_id + 1, verify)
+            else:
+                round_winner_id = cache.play(deck1_recurse, deck2_recurse, game_id + 1, verify)
             round_winner = deck1 if round_winner_id == 1 else deck2
 
             if verbose:
@@ -119,14 +575,12 @@ def play_recursive_combat(deck1: List[int], deck2: List[int], game_id = 1):
             print('Winner of round {} (game {}) is Player {}\n'.format(
                 round_id,
                 game_id,
-                '1' if round_winner == deck1 else '2'))
+                '1' if round_winner is deck1 else '2'))
 
         if round_winner is deck1:
-            deck1.append(card1)
-            deck1.append(card2)
+            deck1.collect(card1, card2)
         elif round_winner is deck2:
-            deck2.append(card2)
-            deck2.append(card1)
+            deck2.collect(card2, card1)
 
         # If a player collects all cards they win
         if not deck1:
@@ -138,7 +592,7 @@ def play_recursive_combat(deck1: List[int], deck2: List[int], game_id = 1):
                 print('Player 2 has no cards left - Player 1 wins game!\n')
             return 1
 
-def calculate_score(deck: List[int]) -> int:
+def calculate_score(deck: Deck) -> int:
     score = 0
     #print('Score')
     #print('   0')
@@ -150,7 +604,113 @@ def calculate_score(deck: List[int]) -> int:
 
     return score
 
+def random_deals(count: int, cards: int = 50,
+                 seed: Optional[int] = None) -> Iterator[Tuple[List[int], List[int]]]:
+    # Shuffle cards 1 .. cards and deal them evenly to both players
+    rng = random.Random(seed)
+    deck = list(range(1, cards + 1))
+    for _ in range(count):
+        rng.shuffle(deck)
+        yield deck[:cards // 2], deck[cards // 2:]
+
+def play_deal(index: int, cards1: List[int], cards2: List[int],
+              max_rounds: Optional[int] = None) -> DealResult:
+    # Play Combat and recursive Combat on a deal. Rounds of recursive
+    # Combat include rounds of sub-games, sub-games answered by the
+    # cache are not counted.
+    deck1 = Deck(cards1)
+    deck2 = Deck(cards2)
+    rounds = play_combat(deck1, deck2, max_rounds)
+    if deck1 and deck2:
+        combat = GameResult(None, None, rounds, 0)
+    else:
+        winner = deck1 if deck1 else deck2
+        combat = GameResult(1 if deck1 else 2, calculate_score(winner), rounds, 0)
+
+    deck1 = Deck(cards1)
+    deck2 = Deck(cards2)
+    game = RecursiveCombat(deck1, deck2, cache = SubGameCache())
+    winner_id = game.run()
+    recursive = GameResult(
+        winner_id,
+        calculate_score(deck1 if winner_id == 1 else deck2),
+        sum(game.depth_rounds),
+        game.games - 1)
+
+    return DealResult(index, combat, recursive)
+
+def play_chunk(chunk: Tuple[int, List[Tuple[List[int], List[int]]]],
+               max_rounds: Optional[int]) -> List[DealResult]:
+    first, deals = chunk
+    return [
+        play_deal(first + i, cards1, cards2, max_rounds)
+        for i, (cards1, cards2) in enumerate(deals)
+    ]
+
+def chunked(deals: Iterable[Tuple[List[int], List[int]]],
+            chunk_size: int) -> Iterator[Tuple[int, List[Tuple[List[int], List[int]]]]]:
+    # Split deals into lists of chunk_size deals
+    # together with the index of the first deal
+    iterator = iter(deals)
+    first = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield first, chunk
+        first += len(chunk)
+
+def play_tournament(deals: Iterable[Tuple[List[int], List[int]]],
+                    workers: Optional[int] = None, chunk_size: int = 64,
+                    max_rounds: Optional[int] = 100000) -> Iterator[DealResult]:
+    # Play every deal in worker processes and yield results in order of
+    # the deals. Deals are consumed lazily and only a few chunks per worker
+    # are in flight at any time, so deals can be generated on the fly.
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in chunked(deals, chunk_size):
+            yield from play_chunk(chunk, max_rounds)
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending: Deque[Future] = deque()
+        for chunk in chunked(deals, chunk_size):
+            pending.append(executor.submit(play_chunk, chunk, max_rounds))
+
+            while len(pending) >= 2 * workers or (pending and pending[0].done()):
+                yield from pending.popleft().result()
+
+        for future in pending:
+            yield from future.result()
+
+def run_tournament(count: int, cards: int, seed: Optional[int], workers: Optional[int]):
+    begin = time.perf_counter()
+
+    wins = { 'combat': [ 0, 0, 0 ], 'recursive': [ 0, 0, 0 ] }
+    for result in play_tournament(random_deals(count, cards, seed), workers):
+        wins['combat'][result.combat.winner or 0] += 1
+        wins['recursive'][result.recursive.winner or 0] += 1
+
+    seconds = time.perf_counter() - begin
+    print('Played {} deals of {} cards in {:.3f}s ({:.1f} deals/s)'.format(
+        count, cards, seconds, count / seconds))
+    print('Combat: player 1 won {}, player 2 won {}, unfinished {}'.format(
+        wins['combat'][1], wins['combat'][2], wins['combat'][0]))
+    print('Recursive Combat: player 1 won {}, player 2 won {}'.format(
+        wins['recursive'][1], wins['recursive'][2]))
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tournament', type = int, metavar = 'DEALS',
+                        help = 'also play this many random deals')
+    parser.add_argument('--cards', type = int, default = 50,
+                        help = 'number of cards in random deals')
+    parser.add_argument('--seed', type = int)
+    parser.add_argument('--workers', type = int)
+    args = parser.parse_args()
+
+
     ############ PART ONE ############
 
     # Read input file
@@ -166,9 +726,17 @@ def main():
     # Read original deck state again
     player1, player2 = read_input_file('day22_input.txt')
 
-    winner_id = play_recursive_combat(player1, player2)
+    cache = SubGameCache()
+    game = RecursiveCombat(player1, player2, cache = cache)
+    winner_id = game.run()
     winner = player1 if winner_id == 1 else player2
     print('Score from game of recursive Combat: {}'.format(calculate_score(winner)))
+    print('Sub-games played: {}, cached: {}, skipped: {} (deepest nesting: {})'.format(
+        cache.misses, cache.hits, cache.skipped, game.max_depth))
+
+    if args.tournament:
+        print()
+        run_tournament(args.tournament, args.cards, args.seed, args.workers)
 
 if __name__ == '__main__':
     main()
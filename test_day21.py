@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import pytest
+
+from day21 import AllergenSolver
+
+def test_rejected_food_leaves_solver_unchanged():
+    solver = AllergenSolver()
+    solver.add_food(['x', 'y'], ['a'])
+    solver.add_food(['x'], ['a'])
+
+    # x already contains a, a food with a but without x is a contradiction
+    with pytest.raises(ValueError):
+        solver.add_food(['y', 'z'], ['a'])
+
+    assert solver.resolved() == { 'x': 'a' }
+    assert solver.candidates == { 0: { 0 } }
+    assert solver.healthy_ingredients() == [ 'y' ]
+    assert solver.healthy_occurrences() == 1
+    assert solver.ingredient_names == [ 'x', 'y' ]
+
+    assignment = solver.solve()
+    assert assignment.matching == { 0: 0 }
+    assert assignment.ambiguous == set()
+
+def test_rejected_food_with_new_names_leaves_solver_unchanged():
+    solver = AllergenSolver()
+    solver.add_food(['x', 'y'], ['a'])
+    solver.add_food(['y', 'z'], ['b'])
+
+    # b can only be z, so a food with a and b but without z is rejected
+    with pytest.raises(ValueError):
+        solver.add_food(['y', 'w'], ['a', 'b', 'c'])
+
+    assert solver.resolved() == {}
+    assert solver.ingredient_names == [ 'x', 'y', 'z' ]
+    assert solver.allergen_names == [ 'a', 'b' ]
+    assert solver.healthy_occurrences() == 0
+
+    # Solver still accepts foods afterwards
+    solver.add_food(['x', 'w'], ['a'])
+    assert solver.resolved() == { 'x': 'a' }
+    assert solver.healthy_ingredients() == [ 'w' ]
+    assert solver.healthy_occurrences() == 1